@@ -16,7 +16,7 @@ router = fastapi.APIRouter(
 @router.get("/", summary="Get all leagues (paginated)")
 async def api_league_get_all(
     filter: typing.Annotated[models.LeagueFilter, fastapi.Query()],
-    op: dependencies.DbOperator,
+    op: dependencies.ReadDbOperator,
 ) -> tuple[models.TournamentFilter, list[models.LeagueMinimal]]:
     if filter.uid or filter.country or not filter.online:
         filter = filter
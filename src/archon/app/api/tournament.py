@@ -1,3 +1,5 @@
+import aiohttp
+import collections
 import dataclasses
 import fastapi
 import logging
@@ -5,9 +7,14 @@ import typing
 import unidecode
 
 from .. import dependencies
+from ... import db
 from ... import events
 from ... import models
 from ... import engine
+from ... import projection
+from ... import seating
+from ... import sequencer
+from ... import vekn
 
 LOG = logging.getLogger()
 router = fastapi.APIRouter(
@@ -20,7 +27,7 @@ router = fastapi.APIRouter(
 @router.get("/", summary="List all tournaments")
 async def api_tournaments(
     filter: typing.Annotated[models.TournamentFilter, fastapi.Query()],
-    op: dependencies.DbOperator,
+    op: dependencies.ReadDbOperator,
     member_uid: dependencies.OptionalMemberUidFromToken,
 ) -> tuple[models.TournamentFilter, list[models.TournamentMinimal]]:
     """List all tournaments.
@@ -78,6 +85,7 @@ async def api_tournaments_post(
     temp_orchestrator = engine.TournamentOrchestrator(**dataclasses.asdict(data))
     temp_orchestrator.update_config(data, member, league)
     uid = await op.create_tournament(data)
+    await op.snapshot_tournament(data)
     return dependencies.ItemUrl(
         uid=uid, url=str(request.url_for("tournament_display", uid=uid))
     )
@@ -98,33 +106,38 @@ async def api_tournament_put(
     league = await op.get_league(data.league.uid) if data.league else None
     orchestrator.update_config(data, member, league)  # checks member can admin
     await op.update_tournament(orchestrator)
+    # config changes are not events: snapshot them so they are kept on replay
+    await op.snapshot_tournament(orchestrator)
     return orchestrator
 
 
-@router.get("/{uid}", summary="Get tournament data")
+@router.get("/{uid}", summary="Get tournament data", response_model=models.Tournament)
 async def api_tournament_get(
     tournament: dependencies.Tournament, member: dependencies.PersonFromToken
-) -> models.Tournament:
+) -> fastapi.Response:
     """Get tournament data
 
     - **uid**: The tournament unique ID
     """
     dependencies.check_can_admin_tournament(member, tournament)
-    return tournament
+    return _json_response(projection.tournament_data(tournament))
 
 
-@router.get("/{uid}/info", summary="Get tournament public information")
+@router.get(
+    "/{uid}/info",
+    summary="Get tournament public information",
+    response_model=models.TournamentInfo | models.TournamentConfig,
+)
 async def api_tournament_get_info(
     tournament: dependencies.TournamentInfo, member: dependencies.PersonFromToken
-) -> models.TournamentInfo | models.TournamentConfig:
+) -> fastapi.Response:
     """Get tournament information
 
     - **uid**: The tournament unique ID
     """
     if member.vekn or member.uid in tournament.players:
-        engine.filter_tournament_for_member(tournament, member.uid)
-        return tournament
-    return models.TournamentConfig(**dataclasses.asdict(tournament))
+        return _json_response(projection.tournament_info(tournament, member.uid))
+    return _json_response(projection.tournament_config(tournament))
 
 
 @router.get("/{uid}/decks", summary="Get tournament decks information")
@@ -159,13 +172,64 @@ async def api_tournament_get_report(
     return fastapi.responses.PlainTextResponse(content=report)
 
 
+@router.get("/{uid}/seating-proposal", summary="Compute next round seating")
+async def api_tournament_get_seating_proposal(
+    uid: typing.Annotated[str, fastapi.Path(title="Tournament unique ID")],
+    member: dependencies.ReleasedPersonFromToken,
+) -> list[list[str]]:
+    """Compute an optimised seating of the checked-in players for the next round.
+
+    Precomputed optimal seatings are used when possible (no player dropped or joined).
+
+    The tournament is not modified: the seating is to be used in a `ROUND_START` event.
+
+    - **uid**: The tournament unique ID
+    """
+    # no connection is held during the optimisation
+    async with db.operator(autocommit=True, pool=db.READ_POOL) as op:
+        tournament = await op.get_tournament(uid)
+    if not tournament:
+        raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+    dependencies.check_can_admin_tournament(member, tournament)
+    round_ = engine.template_seating(tournament)
+    if not round_:
+        round_ = engine.next_round_seating(tournament)
+        if tournament.rounds and round_.tables:
+            await seating.optimise_full_seating(tournament, round_)
+    return [[s.player_uid for s in table.seating] for table in round_.tables]
+
+
+@router.get("/{uid}/history", summary="Get tournament data at a point in time")
+async def api_tournament_get_history(
+    op: dependencies.DbOperator,
+    uid: typing.Annotated[str, fastapi.Path(title="Tournament unique ID")],
+    member: dependencies.PersonFromToken,
+    position: typing.Annotated[int | None, fastapi.Query(ge=0)] = None,
+) -> models.Tournament:
+    """Rebuild the tournament data from its events journal
+
+    Old events are purged from the journal: states they are needed for are gone (410).
+
+    - **uid**: The tournament unique ID
+    - **position**: Number of events to replay (all events if not provided)
+    """
+    config = await op.get_tournament(uid, cls=models.TournamentConfig)
+    if not config:
+        raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+    dependencies.check_can_admin_tournament(member, config)
+    try:
+        return await op.replay_tournament(uid, position)
+    except db.Purged as err:
+        raise fastapi.HTTPException(fastapi.status.HTTP_410_GONE, str(err))
+
+
 @router.get(
     "/venue-completion/{country}/{prefix}",
     summary="Get venue completion for given country and prefiw",
 )
 async def api_tournament_get_venue_completion(
     _: dependencies.MemberUidFromToken,
-    op: dependencies.DbOperator,
+    op: dependencies.ReadDbOperator,
     country: str,
     prefix: str,
 ) -> list[models.VenueCompletion]:
@@ -207,6 +271,7 @@ async def vekn_sync(
     rounds: typing.Annotated[int, fastapi.Path()],
 ) -> models.Tournament:
     await dependencies.vekn_sync(tournament, rounds, member)
+    tournament.extra.pop("vekn_sync_error", None)
     await op.update_tournament(tournament)
     return tournament
 
@@ -247,28 +312,21 @@ async def api_tournament_delete(
     await op.delete_tournament(tournament.uid)
 
 
-@router.post("/{uid}/event", summary="Add tournament event")
-async def api_tournament_event_post(
-    orchestrator: dependencies.TournamentOrchestrator,
-    event: typing.Annotated[
-        events.TournamentEvent, fastapi.Body(openapi_examples=events.OPENAPI_EXAMPLES)
-    ],
-    actor: dependencies.PersonFromToken,
-    op: dependencies.DbOperator,
-) -> models.Tournament | models.TournamentInfo:
-    """Send a new event for this tournament.
-
-    This is the main way of interacting with a tournament data.
-
-    - **uid**: The tournament unique ID
-    """
+async def _check_event(op: db.Operator, event: events.TournamentEvent) -> None:
+    """Checks requiring the members data, before the event is handled."""
     if event.type == events.EventType.REGISTER:
         member = await op.get_member(event.player_uid)
         if any(s.level == events.SanctionLevel.BAN for s in member.sanctions):
             raise engine.BannedPlayer()
-    orchestrator.handle_event(event, actor)
-    await op.record_event(orchestrator.uid, actor.uid, event)
-    await op.update_tournament(orchestrator)
+
+
+async def _record_sanctions(
+    op: db.Operator,
+    orchestrator: engine.TournamentOrchestrator,
+    event: events.TournamentEvent,
+    actor: models.Person,
+) -> None:
+    """Report the event sanctions on the member record."""
     # TODO: we might want to move this in a "VEKN member orchestrator" of sorts
     if (
         event.type == events.EventType.SANCTION
@@ -286,21 +344,263 @@ async def api_tournament_event_post(
             )
         )
         await op.update_member(member)
-        dependencies.invalidate_caches()
+        if event.level == events.SanctionLevel.BAN:
+            await op.refresh_rankings()
+        await dependencies.invalidate_caches(op)
     if event.type == events.EventType.UNSANCTION:
         member = await op.get_member(event.player_uid, for_update=True)
+        banned = any(s.level == events.SanctionLevel.BAN for s in member.sanctions)
         for idx, sanction in enumerate(member.sanctions):
             if sanction.uid == event.sanction_uid:
                 del member.sanctions[idx]
         await op.update_member(member)
-        dependencies.invalidate_caches()
-    if event.type == events.EventType.FINISH_TOURNAMENT:
-        await dependencies.vekn_sync(
-            orchestrator, max(1, len(orchestrator.rounds)), actor
-        )
-        await op.update_tournament(orchestrator)
+        if banned:
+            await op.refresh_rankings()
+        await dependencies.invalidate_caches(op)
+
+
+def _json_response(data: typing.Any) -> fastapi.Response:
+    """Serialized views: skip the response model validation"""
+    return fastapi.Response(projection.dumps(data), media_type="application/json")
+
+
+def _tournament_for_actor(
+    orchestrator: engine.TournamentOrchestrator, actor: models.Person
+) -> dict[str, typing.Any]:
+    """Tournament or TournamentInfo data"""
     if engine.can_admin_tournament(actor, orchestrator):
+        return projection.tournament_data(orchestrator)
+    return projection.tournament_info(orchestrator, actor.uid)
+
+
+@dataclasses.dataclass
+class _Submission:
+    """Events sent by an actor in one request"""
+
+    actor: models.Person
+    batch: list[events.TournamentEvent]
+    #: a rejected event fails the submission (instead of being reported as outcome)
+    strict: bool = False
+    outcomes: list[models.EventOutcome] = dataclasses.field(default_factory=list)
+    applied: list[events.TournamentEvent] = dataclasses.field(default_factory=list)
+    error: Exception | None = None
+    #: the submission finished the tournament: push it to vekn.net once committed
+    vekn_push: bool = False
+
+
+class VeknIdRequired(engine.TournamentError): ...
+
+
+def _check_vekn_push(event: events.TournamentEvent, actor: models.Person) -> None:
+    """The results are pushed to vekn.net in the name of the actor finishing"""
+    if (
+        event.type == events.EventType.FINISH_TOURNAMENT
+        and dependencies.VEKN_PUSH
+        and not actor.vekn
+    ):
+        raise VeknIdRequired("A VEKN ID is required to send the results to vekn.net")
+
+
+async def _handle_submissions(
+    op: db.Operator,
+    orchestrator: engine.TournamentOrchestrator,
+    submissions: list[_Submission],
+) -> None:
+    for submission in submissions:
+        submission.outcomes, submission.applied, submission.error = [], [], None
+        for event in submission.batch:
+            try:
+                _check_vekn_push(event, submission.actor)
+                await _check_event(op, event)
+                orchestrator.handle_event(event, submission.actor)
+            except ValueError as err:
+                if submission.strict:
+                    submission.error = err
+                    break
+                submission.outcomes.append(
+                    models.EventOutcome(uid=event.uid, success=False, detail=str(err))
+                )
+                continue
+            submission.outcomes.append(models.EventOutcome(uid=event.uid))
+            submission.applied.append(event)
+
+
+async def _write_events(
+    op: db.Operator,
+    orchestrator: engine.TournamentOrchestrator,
+    submissions: list[_Submission],
+) -> engine.TournamentOrchestrator:
+    """Handle the submissions events, write the tournament and its journal once.
+
+    In optimistic mode, the tournament is not locked: if it was updated concurrently,
+    the events are handled again on the fresh tournament (a few times at most).
+    Returns the orchestrator the events were applied to.
+    """
+    for _ in range(dependencies.EVENTS_RETRIES + 1):
+        await _handle_submissions(op, orchestrator, submissions)
+        decks = orchestrator.pop_decks()
+        journal = [(s.actor.uid, ev) for s in submissions for ev in s.applied]
+        if not journal:
+            return orchestrator
+        try:
+            # the update locks the tournament: the journal positions are safe
+            await op.update_tournament(
+                orchestrator,
+                orchestrator.pop_changes(),
+                check_version=dependencies.OPTIMISTIC_EVENTS,
+            )
+        except db.Conflict:
+            LOG.info("Concurrent update of tournament %s, retrying", orchestrator.uid)
+            orchestrator = await op.get_tournament(
+                orchestrator.uid, cls=engine.TournamentOrchestrator
+            )
+            if not orchestrator:
+                raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+            continue
+        position = await op.record_events(orchestrator.uid, journal, decks)
+        await op.snapshot_tournament(orchestrator, position, len(journal))
         return orchestrator
-    info = models.TournamentInfo(**dataclasses.asdict(orchestrator))
-    engine.filter_tournament_for_member(info, actor.uid)
-    return info
+    raise fastapi.HTTPException(
+        fastapi.status.HTTP_409_CONFLICT, "Tournament updated concurrently, try again"
+    )
+
+
+async def _vekn_sync_finished(uid: str, actor: models.Person) -> models.Tournament:
+    """Push a finished tournament to vekn.net, record the outcome in the tournament.
+
+    Runs once the events are committed, out of the tournament sequencer:
+    no DB connection is held during the vekn.net calls. A failure is recorded
+    (`extra["vekn_sync_error"]`), the push can be retried with the vekn-sync endpoint.
+    """
+    async with db.operator(autocommit=True) as op:
+        tournament = await op.get_tournament(uid)
+    if not tournament:
+        raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+    error = None
+    try:
+        await dependencies.vekn_sync(tournament, max(1, len(tournament.rounds)), actor)
+    except (
+        fastapi.HTTPException,
+        vekn.VEKNError,
+        aiohttp.ClientError,
+        TimeoutError,
+        ValueError,
+    ) as err:
+        LOG.exception("Failed to push tournament %s to vekn.net", uid)
+        error = str(err) or type(err).__name__
+    async with db.operator() as op:
+        fresh = await op.get_tournament(uid, True, engine.TournamentOrchestrator)
+        if not fresh:
+            raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+        # vekn_id and vekn_submitted, as far as the push went
+        fresh.extra.update(tournament.extra)
+        fresh.extra.pop("vekn_sync_error", None)
+        if error:
+            fresh.extra["vekn_sync_error"] = error
+        await op.update_tournament(fresh)
+    return fresh
+
+
+#: orchestrators of the latest tournaments, reused while their version is current
+ORCHESTRATORS: collections.OrderedDict[str, engine.TournamentOrchestrator] = (
+    collections.OrderedDict()
+)
+ORCHESTRATORS_SIZE = 64
+
+
+async def _process_submissions(
+    uid: str, submissions: list[_Submission]
+) -> list[typing.Any | Exception]:
+    """Apply a group of submissions and commit them once.
+
+    The responses are computed here, before the next group changes the orchestrator.
+    """
+    # removed while in use: if anything fails, it is not reused
+    cached = ORCHESTRATORS.pop(uid, None)
+    async with db.operator() as op:
+        orchestrator = await op.get_current_tournament(
+            uid,
+            cached,
+            for_update=not dependencies.OPTIMISTIC_EVENTS,
+            cls=engine.TournamentOrchestrator,
+        )
+        if not orchestrator:
+            raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+        orchestrator = await _write_events(op, orchestrator, submissions)
+        for submission in submissions:
+            for event in submission.applied:
+                await _record_sanctions(op, orchestrator, event, submission.actor)
+        await op.commit()
+        results = []
+        for submission in submissions:
+            if submission.error:
+                results.append(submission.error)
+                continue
+            submission.vekn_push = any(
+                e.type == events.EventType.FINISH_TOURNAMENT for e in submission.applied
+            )
+            data = _tournament_for_actor(orchestrator, submission.actor)
+            if submission.strict:
+                results.append(data)
+            else:
+                results.append((submission.outcomes, data))
+    ORCHESTRATORS[uid] = orchestrator
+    while len(ORCHESTRATORS) > ORCHESTRATORS_SIZE:
+        ORCHESTRATORS.popitem(last=False)
+    return results
+
+
+#: events of a tournament are applied in order, concurrent requests in one write
+SEQUENCER = sequencer.Sequencer(_process_submissions)
+
+
+@router.post(
+    "/{uid}/event",
+    summary="Add tournament event",
+    response_model=models.Tournament | models.TournamentInfo,
+)
+async def api_tournament_event_post(
+    event: dependencies.TournamentEvent,
+    uid: typing.Annotated[str, fastapi.Path(title="Tournament unique ID")],
+    actor: dependencies.ReleasedPersonFromToken,
+) -> fastapi.Response:
+    """Send a new event for this tournament.
+
+    This is the main way of interacting with a tournament data.
+
+    - **uid**: The tournament unique ID
+    """
+    submission = _Submission(actor=actor, batch=[event], strict=True)
+    data = await SEQUENCER.submit(uid, submission)
+    if submission.vekn_push:
+        tournament = await _vekn_sync_finished(uid, actor)
+        data = _tournament_for_actor(tournament, actor)
+    return _json_response(data)
+
+
+@router.post(
+    "/{uid}/events",
+    summary="Add a batch of tournament events",
+    response_model=tuple[
+        list[models.EventOutcome], models.Tournament | models.TournamentInfo
+    ],
+)
+async def api_tournament_events_post(
+    batch: dependencies.TournamentEvents,
+    uid: typing.Annotated[str, fastapi.Path(title="Tournament unique ID")],
+    actor: dependencies.ReleasedPersonFromToken,
+) -> fastapi.Response:
+    """Send multiple events for this tournament, handled in order.
+
+    The tournament is written only once for the whole batch.
+    A rejected event does not stop the batch: the outcomes list which events
+    were applied, and why the others were not.
+
+    - **uid**: The tournament unique ID
+    """
+    submission = _Submission(actor=actor, batch=batch)
+    outcomes, data = await SEQUENCER.submit(uid, submission)
+    if submission.vekn_push:
+        tournament = await _vekn_sync_finished(uid, actor)
+        data = _tournament_for_actor(tournament, actor)
+    return _json_response((outcomes, data))
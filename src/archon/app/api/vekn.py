@@ -6,6 +6,7 @@ import orjson
 import typing
 
 from .. import dependencies
+from ... import events
 from ... import geo
 from ... import models
 
@@ -96,7 +97,7 @@ class JSONLResponse(fastapi.responses.ORJSONResponse):
 async def api_vekn_members(
     request: fastapi.Request,
     member_uid: dependencies.MemberUidFromToken,
-    op: dependencies.AutocommitDbOperator,
+    op: dependencies.ReadDbOperator,
     since: dependencies.IfNoneMatch,
 ) -> fastapi.Response:
     """
@@ -162,6 +163,28 @@ def _filter_member_data(user: models.Person, target: models.Member) -> M:
     return models.PersonWithRatings(**data)
 
 
+@router.get("/members/search", summary="Search members")
+async def api_vekn_members_search(
+    member: dependencies.PersonFromToken,
+    op: dependencies.ReadDbOperator,
+    filter: typing.Annotated[models.MemberFilter, fastapi.Query()],
+) -> tuple[models.MemberFilter, list[models.PublicPerson]]:
+    """Search members by name (`q`), VEKN ID prefix (`vekn`) and `country`.
+
+    **Authentication**: Required, only for VEKN members.
+
+    **Pagination**: Returns up to 20 members per page, best name matches first.
+    The response is a tuple: `[filter, members]`.
+    If there are more results, the returned `filter` contains `score` and `uid`
+    cursor fields: pass them in your next request to fetch the next page.
+    """
+    if not member.vekn:
+        raise fastapi.HTTPException(fastapi.status.HTTP_403_FORBIDDEN)
+    return await op.search_members(
+        filter, vekn_only=models.MemberRole.ADMIN not in member.roles
+    )
+
+
 @router.get("/members/{uid}", summary="Get a member")
 async def api_vekn_member(
     member: dependencies.PersonFromToken,
@@ -175,6 +198,38 @@ async def api_vekn_member(
     return _filter_member_data(member, await op.get_member(uid))
 
 
+@router.get("/members/{uid}/seats", summary="Get a member's seats history")
+async def api_vekn_member_seats(
+    member: dependencies.PersonFromToken,
+    op: dependencies.ReadDbOperator,
+    uid: typing.Annotated[str, fastapi.Path()],
+) -> list[models.PlayerSeat]:
+    """The member's seats and results in all tournament rounds, latest first.
+
+    **Authentication**: Required. Like the members ratings, the seats of others
+    are only visible to VEKN members.
+    """
+    if member.uid != uid and not member.vekn:
+        raise fastapi.HTTPException(fastapi.status.HTTP_403_FORBIDDEN)
+    return await op.get_player_seats(uid)
+
+
+@router.get("/rankings/{category}", summary="Get the rankings of a category")
+async def api_vekn_rankings(
+    member_uid: dependencies.OptionalMemberUidFromToken,
+    op: dependencies.ReadDbOperator,
+    category: typing.Annotated[models.RankingCategoy, fastapi.Path()],
+) -> list[models.MemberRanking]:
+    """The first 500 ranks, best first. Banned members are not ranked.
+
+    **Authentication**: Optional. Members names are hidden for anonymous requests.
+    """
+    rankings = await op.get_rankings(category)
+    if not member_uid:
+        rankings = [dataclasses.replace(ranking, name="") for ranking in rankings]
+    return rankings
+
+
 @router.post("/members", summary="Add a member")
 async def api_vekn_add_member(
     posting_member: dependencies.PersonFromToken,
@@ -333,7 +388,9 @@ async def api_vekn_member_sanction(
         raise fastapi.HTTPException(fastapi.status.HTTP_400_BAD_REQUEST)
     target.sanctions.append(sanction)
     await op.update_member(target)
-    dependencies.invalidate_caches()
+    if sanction.level == events.SanctionLevel.BAN:
+        await op.refresh_rankings()
+    await dependencies.invalidate_caches(op)
     return _filter_member_data(member, target)
 
 
@@ -349,9 +406,12 @@ async def api_vekn_member_sanction_delete(
     target = await op.get_member(uid, True)
     if not any(s.uid == sanction_uid for s in target.sanctions):
         raise fastapi.HTTPException(fastapi.status.HTTP_404_NOT_FOUND)
+    banned = any(s.level == events.SanctionLevel.BAN for s in target.sanctions)
     target.sanctions = [s for s in target.sanctions if s.uid != sanction_uid]
     await op.update_member(target)
-    dependencies.invalidate_caches()
+    if banned:
+        await op.refresh_rankings()
+    await dependencies.invalidate_caches(op)
     return _filter_member_data(member, target)
 
 
@@ -1,6 +1,7 @@
 import aiohttp
 import asyncio
 import base64
+import collections
 import dataclasses
 import datetime
 import dotenv
@@ -15,6 +16,7 @@ import jwt
 import krcg.deck
 import logging
 import os
+import psycopg_pool
 import pydantic.dataclasses
 import typing
 import urllib.parse
@@ -23,6 +25,7 @@ import zoneinfo
 
 from .. import db
 from .. import engine
+from .. import events
 from .. import models
 from .. import vekn
 
@@ -30,6 +33,9 @@ from .. import vekn
 dotenv.load_dotenv()
 
 VEKN_PUSH = os.getenv("VEKN_PUSH", "")
+# events endpoints do not lock the tournament, they retry on concurrent updates
+OPTIMISTIC_EVENTS = bool(os.getenv("OPTIMISTIC_EVENTS", ""))
+EVENTS_RETRIES = int(os.getenv("EVENTS_RETRIES", "3"))
 SESSION_KEY = os.getenv("SESSION_KEY", "dev_key")
 SITE_URL_BASE = os.getenv("SITE_URL_BASE", "http://127.0.0.1:8000")
 DISCORD_CLIENT_ID = os.getenv("DISCORD_CLIENT_ID")
@@ -95,10 +101,10 @@ class DiscordAuth:
 
 # ############################################################################# Database
 def get_db_op(
-    autocommit: bool = False,
+    autocommit: bool = False, pool: psycopg_pool.AsyncConnectionPool | None = None
 ) -> typing.Callable[[], typing.AsyncIterator[db.Operator]]:
     async def ret_function() -> typing.AsyncIterator[db.Operator]:
-        async with db.operator(autocommit=autocommit) as op:
+        async with db.operator(autocommit=autocommit, pool=pool) as op:
             yield op
 
     return ret_function
@@ -108,6 +114,10 @@ DbOperator = typing.Annotated[db.Operator, fastapi.Depends(get_db_op(autocommit=
 AutocommitDbOperator = typing.Annotated[
     db.Operator, fastapi.Depends(get_db_op(autocommit=True))
 ]
+# Read-only operations, possibly on a replica: no read-your-writes guarantee
+ReadDbOperator = typing.Annotated[
+    db.Operator, fastapi.Depends(get_db_op(autocommit=True, pool=db.READ_POOL))
+]
 
 
 def get_member_uid_from_session(request: fastapi.Request) -> str:
@@ -126,7 +136,7 @@ MemberUidFromSession = typing.Annotated[
 async def get_person_from_session(
     request: fastapi.Request, member_uid: MemberUidFromSession, op: DbOperator
 ) -> models.Person:
-    member = await op.get_member(member_uid, cls=models.Person)
+    member = await op.get_member(member_uid, cls=models.Person, cached=True)
     # Valid user_id in session, but member not in DB
     if not member:
         anonymous_session(request)
@@ -134,7 +144,7 @@ async def get_person_from_session(
     return member
 
 
-#: Check we're in an authenticated session and return the member data from DB
+#: Check we're in an authenticated session and return the member data (cached)
 PersonFromSession = typing.Annotated[
     models.Person, fastapi.Depends(get_person_from_session)
 ]
@@ -209,6 +219,42 @@ TournamentOrchestrator = typing.Annotated[
 ]
 
 
+async def prefetch_decks(tournament_events: list[events.TournamentEvent]) -> None:
+    """Fetch and parse the events decks in threads, so handlers find them in cache"""
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(engine.prefetch_deck, ev.deck, True)
+            for ev in tournament_events
+            if ev.type == events.EventType.SET_DECK
+        )
+    )
+
+
+async def get_tournament_event(
+    event: typing.Annotated[
+        events.TournamentEvent, fastapi.Body(openapi_examples=events.OPENAPI_EXAMPLES)
+    ],
+) -> events.TournamentEvent:
+    await prefetch_decks([event])
+    return event
+
+
+async def get_tournament_events(
+    batch: typing.Annotated[list[events.TournamentEvent], fastapi.Body()],
+) -> list[events.TournamentEvent]:
+    await prefetch_decks(batch)
+    return batch
+
+
+# Decks are prefetched: declare it before the TournamentOrchestrator (lock)
+TournamentEvent = typing.Annotated[
+    events.TournamentEvent, fastapi.Depends(get_tournament_event)
+]
+TournamentEvents = typing.Annotated[
+    list[events.TournamentEvent], fastapi.Depends(get_tournament_events)
+]
+
+
 # ################################################################################ Utils
 async def vekn_sync(tournament: models.Tournament, rounds: int, user: models.Person):
     if not VEKN_PUSH:
@@ -239,11 +285,20 @@ async def vekn_sync_member(member: models.Member) -> None:
     await vekn.create_member(member)
 
 
-# Registry for cache invalidation functions
-_cache_invalidators: list[typing.Callable[[], None]] = []
+#: channel of the caches depending on the members rankings and sanctions
+RANKINGS_CACHE = "cache_rankings"
+# Registry for cache invalidation functions, by channel
+_cache_invalidators: dict[str, list[typing.Callable[[], None]]] = (
+    collections.defaultdict(list)
+)
 
 
-def async_timed_cache(duration: datetime.timedelta = datetime.timedelta(minutes=5)):
+def async_timed_cache(
+    duration: datetime.timedelta = datetime.timedelta(minutes=5),
+    channel: str = RANKINGS_CACHE,
+):
+    """Cache the function result. Invalidated on its channel (see invalidate_caches)"""
+
     def wrapper(async_fun):
         lock = asyncio.Lock()
         cache = []
@@ -264,18 +319,31 @@ def async_timed_cache(duration: datetime.timedelta = datetime.timedelta(minutes=
             return cache[1]
 
         inner.invalidate = invalidate
-        _cache_invalidators.append(invalidate)
+        _cache_invalidators[channel].append(invalidate)
         return inner
 
     return wrapper
 
 
-def invalidate_caches():
-    """Invalidate all ranking-related caches"""
-    for invalidator in _cache_invalidators:
+def _invalidate_channel(channel: str) -> None:
+    for invalidator in _cache_invalidators.get(channel, []):
         invalidator()
 
 
+async def invalidate_caches(op: db.Operator, channel: str = RANKINGS_CACHE):
+    """Invalidate the channel caches, here right away and in all workers on commit"""
+    _invalidate_channel(channel)
+    await op.notify(channel)
+
+
+def cache_handlers() -> dict[str, db.NotifyHandler]:
+    """Notification handlers invalidating the caches, for db.listen"""
+    return {
+        channel: lambda _payload, channel=channel: _invalidate_channel(channel)
+        for channel in _cache_invalidators
+    }
+
+
 async def parse_if_none_match(
     inm_raw: str | None = fastapi.Header(None, alias="If-None-Match"),
 ) -> datetime.datetime | None:
@@ -494,7 +562,7 @@ async def get_session_context(
     member = None
     uid = request.session.get("user_id", None)
     if uid:
-        member = await op.get_member(uid)
+        member = await op.get_member(uid, cached=True)
         if member:
             return {
                 "member": member,
@@ -797,7 +865,7 @@ async def get_person_from_token(
     member_uid: MemberUidFromToken,
     op: DbOperator,
 ) -> models.Person:
-    member = await op.get_member(member_uid, cls=models.Person)
+    member = await op.get_member(member_uid, cls=models.Person, cached=True)
     if member is None:
         raise fastapi.HTTPException(
             status_code=fastapi.status.HTTP_401_UNAUTHORIZED,
@@ -807,12 +875,28 @@ async def get_person_from_token(
     return member
 
 
-# The "normal" way of getting a member data (no lock)
+# The "normal" way of getting a member data (no lock, cached: do not modify it)
 PersonFromToken = typing.Annotated[
     models.Person, fastapi.Depends(get_person_from_token)
 ]
 
 
+async def get_person_from_token_released(
+    member_uid: MemberUidFromToken,
+) -> models.Person:
+    member = db.cached_member(member_uid, models.Person)
+    if member:
+        return member
+    async with db.operator(autocommit=True) as op:
+        return await get_person_from_token(member_uid, op)
+
+
+# Same, but the DB connection is released right away (not held for the request)
+ReleasedPersonFromToken = typing.Annotated[
+    models.Person, fastapi.Depends(get_person_from_token_released)
+]
+
+
 async def get_member_from_token(
     member_uid: MemberUidFromToken,
     op: DbOperator,
@@ -5,16 +5,14 @@ import fastapi.encoders
 import fastapi.templating
 import importlib.resources
 import logging
-import math
 import typing
 
 
 from .. import dependencies
 from ... import geo
 from ... import models
-from ... import events
 from ... import engine
-from ... import scoring
+from ... import projection
 
 LOG = logging.getLogger()
 
@@ -338,58 +336,31 @@ async def root(request: fastapi.Request):
     )
 
 
-def _ranked(members: list[models.Person], category: models.RankingCategoy):
-    members = [
-        m
-        for m in members
-        if not any(s.level == events.SanctionLevel.BAN for s in m.sanctions)
-    ]
-    members.sort(key=lambda x: -x.ranking.get(category, 0))
-    rank, passed, rating = 0, 0, math.inf
-    for member in members:
-        member_rating = member.ranking.get(category, 0)
-        if member_rating == 0:
-            break
-        if member_rating < rating:
-            rank += 1 + passed
-            rating = member_rating
-            passed = 0
-        else:
-            passed += 1
-        if rank > 500:
-            break
-        yield rank, member
-
-
 @dependencies.async_timed_cache()
 async def _get_rankings(
-    op: dependencies.DbOperator,
-) -> dict[str, list[tuple[int, models.Person]]]:
-    ret = {}
-    for category in models.RankingCategoy:
-        members = await op.get_ranked_members(category)
-        ret[category.value] = list(_ranked(members, category))
-    return ret
+    op: dependencies.ReadDbOperator,
+) -> dict[str, list[models.MemberRanking]]:
+    return {
+        category.value: await op.get_rankings(category)
+        for category in models.RankingCategoy
+    }
 
 
 @dependencies.async_timed_cache()
 async def _get_rankings_anonymised(
-    op: dependencies.DbOperator,
-) -> dict[str, list[tuple[int, models.Person]]]:
-    ret = {}
-    for category in models.RankingCategoy:
-        members = await op.get_ranked_members(category)
-        for member in members:
-            member.name = ""
-        ret[category.value] = list(_ranked(members, category))
-    return ret
+    op: dependencies.ReadDbOperator,
+) -> dict[str, list[models.MemberRanking]]:
+    return {
+        category: [dataclasses.replace(ranking, name="") for ranking in rankings]
+        for category, rankings in (await _get_rankings(op)).items()
+    }
 
 
 @router.get("/index.html")
 async def index(
     request: fastapi.Request,
     context: dependencies.SessionContext,
-    op: dependencies.DbOperator,
+    op: dependencies.ReadDbOperator,
 ):
     request.session["next"] = str(request.url_for("index"))
     if "member" not in context:
@@ -443,10 +414,6 @@ async def tournament_list(
     )
 
 
-def _filter(cls, filter_cls, obj):
-    return cls(**dataclasses.asdict(filter_cls(**dataclasses.asdict(obj))))
-
-
 @router.get("/tournament/{uid}/display.html")
 async def tournament_display(
     request: fastapi.Request,
@@ -461,47 +428,30 @@ async def tournament_display(
         context["deck_infos"] = engine.deck_infos(tournament, context["member"])
     # non-members get only public info
     if not member_uid:
-        context["tournament"] = models.TournamentConfig(
-            **dataclasses.asdict(tournament)
-        )
+        context["tournament"] = projection.tournament_config(tournament)
         return TEMPLATES.TemplateResponse(
             request=request,
             name="tournament/display.html.j2",
             context=context,
         )
-    # filter out private/organizer info
-    tournament = models.TournamentInfo(**dataclasses.asdict(tournament))
-    # strip other players' deck data (keeps requester's own deck and seat decks)
-    engine.filter_tournament_for_member(tournament, member_uid)
-    # now filter out other members info depending on standings mode
-    provide_score = set()
-    if member_uid:
-        provide_score.add(member_uid)
-    if tournament.standings_mode == models.StandingsMode.TOP_10:
-        for rank, player in engine.standings(tournament):
-            if rank > 10:
-                break
-            provide_score.add(player.uid)
+    # filter out other members info depending on standings mode
+    provide_score = None
+    if not (
+        tournament.standings_mode == models.StandingsMode.PUBLIC
+        or tournament.state
+        in [models.TournamentState.FINALS, models.TournamentState.FINISHED]
+    ):
+        provide_score = {member_uid}
+        if tournament.standings_mode == models.StandingsMode.TOP_10:
+            for _, player in engine.standings_index(tournament).top(10):
+                provide_score.add(player.uid)
     if tournament.standings_mode == models.StandingsMode.CUTOFF:
-        cutoff = scoring.Score()
-        for rank, player in engine.standings(tournament):
-            cutoff = player.result
-            if rank > 5:
-                break
-        context["cutoff"] = cutoff
-    for k, v in tournament.players.items():
-        if k == member_uid:
-            pass
-        elif (
-            tournament.standings_mode == models.StandingsMode.PUBLIC
-            or tournament.state
-            in [models.TournamentState.FINALS, models.TournamentState.FINISHED]
-            or k in provide_score
-        ):
-            tournament.players[k] = _filter(models.Player, models.PlayerInfo, v)
-        else:
-            tournament.players[k] = _filter(models.Player, models.PublicPerson, v)
-    context["tournament"] = tournament
+        context["cutoff"] = engine.standings_index(tournament).cutoff()
+    # filter out private/organizer info and other players' deck data
+    # (keeps requester's own deck and seat decks)
+    context["tournament"] = projection.tournament_info(
+        tournament, member_uid, provide_score
+    )
     return TEMPLATES.TemplateResponse(
         request=request,
         name="tournament/display.html.j2",
@@ -595,21 +545,21 @@ async def tournament_print_standings(
     tournament: dependencies.Tournament,
 ):
     context["round_number"] = len(tournament.rounds)
-    standings = engine.standings(tournament)
+    standings = engine.standings_index(tournament)
     finished = tournament.state == models.TournamentState.FINISHED
     context["finished"] = finished
     if finished:
-        context["standings"] = standings
+        context["standings"] = standings.ranked()
     else:
         match tournament.standings_mode:
             case models.StandingsMode.PRIVATE:
                 context["private"] = True
             case models.StandingsMode.CUTOFF:
-                context["cutoff"] = standings[4][1].result
+                context["cutoff"] = standings.ranked()[4][1].result
             case models.StandingsMode.TOP_10:
-                context["standings"] = [(r, p) for r, p in standings if r <= 10]
+                context["standings"] = standings.top(10)
             case models.StandingsMode.PUBLIC:
-                context["standings"] = standings
+                context["standings"] = standings.ranked()
     return TEMPLATES.TemplateResponse(
         request=request,
         name="tournament/print-standings.html.j2",
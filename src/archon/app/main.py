@@ -19,6 +19,7 @@ import uvicorn.logging
 
 from .. import db
 from .. import engine
+from .. import seating
 from .. import vekn
 from . import dependencies
 from .api import admin as api__admin
@@ -72,7 +73,7 @@ async def sync_vekn_members(op: db.Operator) -> None:
 async def sync_vekn() -> int | None:
     if __debug__:
         return 1
-    async with db.operator(autocommit=True) as op:
+    async with db.operator(autocommit=True, pool=db.BACKGROUND_POOL) as op:
         await op.purge_tournament_events()
         await op.close_old_tournaments()
         await sync_vekn_members(op)
@@ -121,15 +122,19 @@ def log_sync_errors(task: asyncio.Task) -> None:
 async def lifespan(app: fastapi.FastAPI):
     """Initialize the DB pool"""
     LOG.debug("Entering APP lifespan")
-    async with db.POOL:
+    async with db.pools():
         # idempotent init, call it every time
         await db.init()
         # sync VEKN asynchronously, start in the meantime
         task = asyncio.create_task(sync_vekn())
         task.add_done_callback(log_sync_errors)
+        # invalidate the caches on changes made by any worker
+        listener = asyncio.create_task(db.listen(dependencies.cache_handlers()))
         krcg.vtes.VTES.load()
         yield
+        listener.cancel()
         task.cancel()
+        seating.shutdown()
     LOG.debug("Exiting APP lifespan")
 
 
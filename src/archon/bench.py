@@ -0,0 +1,215 @@
+"""Engine micro-benchmarks on synthetic tournaments.
+
+Gives a baseline to compare the engine performance across changes:
+`archon bench` outputs the results as JSON.
+"""
+
+import collections
+import dataclasses
+import datetime
+import orjson
+import platform
+import random
+import statistics
+import time
+import typing
+import uuid
+
+from . import engine
+from . import events
+from . import models
+
+SIZES = [20, 100, 500, 2000]
+ROUNDS = 3
+REPEAT = 5
+JUDGE = models.Person(name="Judge", uid=str(uuid.UUID(int=0)))
+
+
+@dataclasses.dataclass
+class SyntheticTournament:
+    config: dict[str, typing.Any]
+    events: list[events.TournamentEvent]
+    tournament: engine.TournamentOrchestrator
+    #: a valid seating for an additional round (no predator-prey repeat)
+    next_seating: list[list[str]]
+
+
+def _uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def _seating(
+    tournament: engine.TournamentOrchestrator, players: list[str], rng: random.Random
+) -> list[list[str]]:
+    """Random seating without predator-prey repeat"""
+    players = players[:]
+    while True:
+        rng.shuffle(players)
+        seating = [
+            [seat.player_uid for seat in table.seating]
+            for table in engine._seat_players(players).tables
+        ]
+        try:
+            tournament._check_pp_relationships(None, seating)
+        except engine.PredatorPreyDuplicate:
+            continue
+        return seating
+
+
+def _table_vps(table: list[str], rng: random.Random) -> list[float]:
+    """Random valid VPs: random ousts in turn order, last one standing gets 2VP"""
+    vps = [0.0] * len(table)
+    remaining = list(range(len(table)))
+    while len(remaining) > 1:
+        i = rng.randrange(len(remaining))
+        vps[remaining[i]] += 1
+        del remaining[(i + 1) % len(remaining)]
+    vps[remaining[0]] += 1
+    return vps
+
+
+def synthetic_tournament(
+    players: int, rounds: int = ROUNDS, seed: int = 0
+) -> SyntheticTournament:
+    """Generate a finished tournament, with the events producing it.
+    A few players drop out after each round.
+    """
+    rng = random.Random(seed)
+    config = {
+        "name": f"Benchmark {players}",
+        "start": datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC),
+        "judges": [models.PublicPerson(name=JUDGE.name, uid=JUDGE.uid)],
+    }
+    tournament = engine.TournamentOrchestrator(**config)
+    evts = []
+
+    def handle(ev: events.TournamentEvent) -> None:
+        tournament.handle_event(ev, JUDGE)
+        evts.append(ev)
+
+    handle(events.OpenRegistration(type=events.EventType.OPEN_REGISTRATION))
+    for i in range(players):
+        handle(
+            events.Register(
+                type=events.EventType.REGISTER,
+                name=f"Player {i}",
+                player_uid=_uid(rng),
+            )
+        )
+    handle(events.OpenCheckin(type=events.EventType.OPEN_CHECKIN))
+    handle(events.CheckEveryoneIn(type=events.EventType.CHECK_EVERYONE_IN))
+    active = list(tournament.players)
+    for number in range(1, rounds + 1):
+        seating = _seating(tournament, active, rng)
+        handle(events.RoundStart(type=events.EventType.ROUND_START, seating=seating))
+        for table in seating:
+            for uid, vps in zip(table, _table_vps(table, rng)):
+                handle(
+                    events.SetResult(
+                        type=events.EventType.SET_RESULT,
+                        player_uid=uid,
+                        round=number,
+                        vps=vps,
+                    )
+                )
+        handle(events.RoundFinish(type=events.EventType.ROUND_FINISH))
+        for uid in rng.sample(active, len(active) // 20):
+            handle(events.Drop(type=events.EventType.DROP, player_uid=uid))
+            active.remove(uid)
+    next_seating = _seating(tournament, active, rng)
+    seeds = [p.uid for _, p in engine.standings(tournament)[:5]]
+    handle(events.SeedFinals(type=events.EventType.SEED_FINALS, toss={}, seeds=seeds))
+    handle(events.SeatFinals(type=events.EventType.SEAT_FINALS, seating=seeds))
+    for uid, vps in zip(seeds, _table_vps(seeds, rng)):
+        handle(
+            events.SetResult(
+                type=events.EventType.SET_RESULT,
+                player_uid=uid,
+                round=rounds + 1,
+                vps=vps,
+            )
+        )
+    handle(events.FinishTournament(type=events.EventType.FINISH_TOURNAMENT))
+    return SyntheticTournament(config, evts, tournament, next_seating)
+
+
+def _summary(name: str, players: int, timings: list[int]) -> dict[str, typing.Any]:
+    """Timings are in nanoseconds, the summary in microseconds"""
+    return {
+        "name": name,
+        "players": players,
+        "count": len(timings),
+        "min_us": min(timings) / 1000,
+        "median_us": statistics.median(timings) / 1000,
+        "mean_us": statistics.fmean(timings) / 1000,
+        "max_us": max(timings) / 1000,
+    }
+
+
+def _measure(fn: typing.Callable[[], typing.Any], repeat: int) -> list[int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def bench_events(synthetic: SyntheticTournament, repeat: int) -> list[dict]:
+    """Replay the events on a fresh tournament, time handle_event by event type"""
+    timings = collections.defaultdict(list)
+    for _ in range(repeat):
+        tournament = engine.TournamentOrchestrator(**synthetic.config)
+        for ev in synthetic.events:
+            start = time.perf_counter_ns()
+            tournament.handle_event(ev, JUDGE)
+            timings[ev.type].append(time.perf_counter_ns() - start)
+    players = len(synthetic.tournament.players)
+    return [
+        _summary(f"handle_event.{event_type}", players, t)
+        for event_type, t in timings.items()
+    ]
+
+
+def bench_tournament(synthetic: SyntheticTournament, repeat: int) -> list[dict]:
+    """Time the engine computations and (de)serialization of the final tournament"""
+    tournament = synthetic.tournament
+    data = orjson.dumps(dataclasses.asdict(tournament))
+    # plain model, as loaded from the DB: no index maintained
+    plain = models.Tournament(**orjson.loads(data))
+    players = len(tournament.players)
+    benchmarks = {
+        "standings": lambda: engine.standings(plain),
+        "ratings": lambda: engine.ratings(plain),
+        "_check_pp_relationships": lambda: tournament._check_pp_relationships(
+            None, synthetic.next_seating
+        ),
+        "_recompute_rounds_played": tournament._recompute_rounds_played,
+        "from_jsonb": lambda: engine.TournamentOrchestrator(**orjson.loads(data)),
+        "asdict": lambda: dataclasses.asdict(tournament),
+        "asdict_round_trip": lambda: models.Tournament(
+            **dataclasses.asdict(tournament)
+        ),
+    }
+    return [
+        _summary(name, players, _measure(fn, repeat)) for name, fn in benchmarks.items()
+    ]
+
+
+def run(
+    sizes: list[int] | None = None, rounds: int = ROUNDS, repeat: int = REPEAT
+) -> dict[str, typing.Any]:
+    """Run all benchmarks, returns a JSON-serializable report"""
+    results = []
+    for players in sizes or SIZES:
+        synthetic = synthetic_tournament(players, rounds)
+        results.extend(bench_events(synthetic, repeat))
+        results.extend(bench_tournament(synthetic, repeat))
+    return {
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rounds": rounds,
+        "repeat": repeat,
+        "results": results,
+    }
@@ -0,0 +1,63 @@
+"""In-process caches.
+
+The entries are evicted explicitly when the source data changes (eg. on a DB
+notification), the TTL only bounds the staleness if a notification is missed.
+"""
+
+import collections
+import time
+import typing
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class LRUCache(typing.Generic[K, V]):
+    """Least recently used cache, entries expire after `ttl` seconds.
+
+    A disabled cache stores nothing. `version` changes on every eviction:
+    a value computed before an eviction is not stored (see `set`).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        ttl: float,
+        enabled: bool = True,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.version = 0
+        self.entries: collections.OrderedDict[K, tuple[float, V]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: K) -> V | None:
+        if not self.enabled or key not in self.entries:
+            return None
+        expires, value = self.entries[key]
+        if self.clock() > expires:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, version: int | None = None) -> None:
+        """Store the value, unless entries were evicted since the given version"""
+        if not self.enabled or (version is not None and version != self.version):
+            return
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self.version += 1
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.version += 1
+        self.entries.clear()
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import asyncio
+import builtins
 import logging
+import orjson
 import os
+import pathlib
 import typer
 import typing
 
+from . import bench as bench_
 from . import db
 from . import models
 from . import vekn
@@ -96,22 +100,24 @@ def sync_events() -> None:
     asyncio.run(get_events())
 
 
-async def db_purge() -> tuple[int, int]:
+async def db_purge() -> tuple[int, int, int]:
     async with db.POOL:
         async with db.operator() as op:
             events_count = await op.purge_tournament_events()
             tournaments_count = await op.close_old_tournaments()
-            return events_count, tournaments_count
+            members_count = await op.expire_rankings()
+            return events_count, tournaments_count, members_count
 
 
 @app.command()
 def purge() -> None:
-    """Purge deprecated historical data and close old tournaments"""
-    events_count, tournaments_count = asyncio.run(db_purge())
+    """Purge deprecated historical data, close old tournaments, expire rankings"""
+    events_count, tournaments_count, members_count = asyncio.run(db_purge())
     print(f"{events_count} event record", f"{'s' if events_count != 1 else ''} deleted")
     print(
         f"{tournaments_count} tournament{'s' if tournaments_count != 1 else ''} closed"
     )
+    print(f"{members_count} ranking{'s' if members_count != 1 else ''} updated")
 
 
 async def async_add_client(name: str) -> tuple[str, str]:
@@ -228,6 +234,27 @@ def push_vekn() -> None:
     asyncio.run(async_push_vekn())
 
 
+@app.command()
+def bench(
+    size: typing.Annotated[
+        builtins.list[int], typer.Option(help="Number of players (repeatable)")
+    ] = bench_.SIZES,
+    rounds: int = bench_.ROUNDS,
+    repeat: int = bench_.REPEAT,
+    output: typing.Annotated[
+        pathlib.Path | None, typer.Option(help="JSON output file (default: stdout)")
+    ] = None,
+) -> None:
+    """Benchmark the tournament engine on synthetic tournaments"""
+    report = orjson.dumps(
+        bench_.run(size, rounds, repeat), option=orjson.OPT_INDENT_2
+    ).decode()
+    if output:
+        output.write_text(report)
+    else:
+        print(report)
+
+
 if __name__ == "__main__":
     handler = logging.StreamHandler()
     LOG.addHandler(handler)
@@ -1,13 +1,24 @@
+import bisect
 import collections
 import dataclasses
 import datetime
+import functools
+import hashlib
+import importlib.resources
 import io
 import itertools
 import krcg.seating
 import krcg.deck
 import logging
 import math
+import numpy
+import orjson
 import random
+import struct
+import threading
+import time
+import typing
+import zlib
 import zoneinfo
 
 from . import geo
@@ -36,6 +47,8 @@ class TournamentManager(models.Tournament):
 
     def handle_event(self, ev: events.TournamentEvent, member: models.Person) -> None:
         LOG.debug("Handling event: %s", ev)
+        if ev.type not in STANDINGS_NEUTRAL_EVENTS:
+            self._standings = None
         match ev.type:
             case events.EventType.REGISTER:
                 self.register(ev, member)
@@ -83,6 +96,72 @@ class TournamentManager(models.Tournament):
                 self.finish_tournament(ev, member)
             case events.EventType.REOPEN_TOURNAMENT:
                 self.reopen_tournament(ev, member)
+        self._record_changes(ev)
+
+    def _record_changes(self, ev: events.TournamentEvent) -> None:
+        """Record the parts of the tournament changed by the event, for partial writes.
+
+        Only the most frequent events are tracked precisely,
+        the others require the whole tournament to be written.
+        """
+        changes = getattr(self, "_changes", None)
+        if changes is None:
+            changes = self._changes = Changes()
+        if changes.full:
+            return
+        match ev.type:
+            case (
+                events.EventType.REGISTER
+                | events.EventType.CHECK_IN
+                | events.EventType.CHECK_OUT
+                | events.EventType.DROP
+            ):
+                changes.players.add(ev.player_uid)
+            case events.EventType.SET_RESULT:
+                table, _ = self._seat_index(ev.round)[ev.player_uid]
+                self._record_table_changes(changes, ev.round, table)
+            case events.EventType.SET_DECK:
+                changes.players.add(ev.player_uid)
+                if ev.round:
+                    table, _ = self._seat_index(ev.round)[ev.player_uid]
+                    changes.tables.add((ev.round - 1, table))
+            case events.EventType.OVERRIDE | events.EventType.UNOVERRIDE:
+                self._record_table_changes(changes, ev.round, ev.table - 1)
+            case events.EventType.SANCTION | events.EventType.UNSANCTION:
+                changes.players.add(ev.player_uid)
+                changes.fields.add("sanctions")
+            case _:
+                changes.full = True
+
+    def _record_table_changes(self, changes: "Changes", number: int, table: int):
+        """Table scores change the seated players results, and the finals winner"""
+        changes.tables.add((number - 1, table))
+        changes.players.update(
+            s.player_uid for s in self.rounds[number - 1].tables[table].seating
+        )
+        changes.fields.add("winner")
+
+    def pop_changes(self) -> "Changes":
+        """Parts of the tournament changed by the events handled since last call"""
+        changes = getattr(self, "_changes", None) or Changes()
+        self._changes = None
+        return changes
+
+    def _event_decks(self) -> dict[str, models.KrcgDeck]:
+        decks = getattr(self, "_decks", None)
+        if decks is None:
+            decks = self._decks = {}
+        return decks
+
+    def resolve_deck(self, event_uid: str, deck: models.KrcgDeck) -> None:
+        """Provide the deck of a SET_DECK event, so it is not parsed (journal replay)"""
+        self._event_decks()[event_uid] = deck
+
+    def pop_decks(self) -> dict[str, models.KrcgDeck]:
+        """Decks of the SET_DECK events handled since last call, by event uid"""
+        decks = getattr(self, "_decks", None) or {}
+        self._decks = None
+        return decks
 
     def is_judge(self, member) -> bool:
         if member.uid in [j.uid for j in self.judges]:
@@ -113,12 +192,8 @@ class TournamentManager(models.Tournament):
             if self.state in [
                 models.TournamentState.PLAYING,
                 models.TournamentState.FINALS,
-            ]:
-                round_ = self.rounds[-1]
-                for table in round_.tables:
-                    for seat in table.seating:
-                        if seat.player_uid == ev.player_uid:
-                            player.state = models.PlayerState.PLAYING
+            ] and ev.player_uid in self._seat_index(len(self.rounds)):
+                player.state = models.PlayerState.PLAYING
             return
         # new player
         state = models.PlayerState.REGISTERED
@@ -201,6 +276,7 @@ class TournamentManager(models.Tournament):
     def round_start(self, ev: events.RoundStart, member: models.Person) -> None:
         self.state = models.TournamentState.PLAYING
         self.rounds.append(self._event_seating_to_round(ev.seating))
+        self._index_round(len(self.rounds))
         self._set_players_statuses_from_current_round()
         # reset the toss if we mistakenly tossed for finals then canceled it
         # before starting this new round
@@ -208,16 +284,12 @@ class TournamentManager(models.Tournament):
             player.toss = 0
 
     def _set_players_statuses_from_current_round(self) -> None:
-        players = {
-            seat.player_uid: (i, j)
-            for i, table in enumerate(self.rounds[-1].tables, 1)
-            for j, seat in enumerate(table.seating, 1)
-        }
+        players = self._seat_index(len(self.rounds))
         for player in self.players.values():
             if player.uid in players:
                 player.state = models.PlayerState.PLAYING
-                player.table = players[player.uid][0]
-                player.seat = players[player.uid][1]
+                player.table = players[player.uid][0] + 1
+                player.seat = players[player.uid][1] + 1
             else:
                 player.table = 0
                 player.seat = 0
@@ -244,7 +316,9 @@ class TournamentManager(models.Tournament):
             for seat in table.seating
         }
         overrides = {i: table.override for i, table in enumerate(old_tables)}
+        self._index_round(round, remove=True)
         self.rounds[round - 1] = self._event_seating_to_round(seating)
+        self._index_round(round)
         # if this is the current round, change players statuses accordingly
         finals = False
         if round == len(self.rounds):
@@ -259,7 +333,7 @@ class TournamentManager(models.Tournament):
             table.override = overrides.pop(i, None)
             for seat in table.seating:
                 seat.result, seat.deck = results.pop(
-                    seat.player_uid, (scoring.Score(), None)
+                    seat.player_uid, (scoring.Score.unchecked(), None)
                 )
             self._compute_table_score_and_state(table, finals=finals)
         # remove previous result for players who are removed from the new seating
@@ -317,6 +391,7 @@ class TournamentManager(models.Tournament):
         for table in self.rounds[-1].tables:
             for seat in table.seating:
                 self.players[seat.player_uid].result -= seat.result
+        self._index_round(len(self.rounds), remove=True)
         del self.rounds[-1]
         self.state = models.TournamentState.WAITING
         for player in self.players.values():
@@ -328,6 +403,83 @@ class TournamentManager(models.Tournament):
         self.finals_seeds = []
         self._recompute_rounds_played()
 
+    def _pp_index(self) -> dict[tuple[str, str], set[int]]:
+        """Predator-prey index: {(predator_uid, prey_uid): {round numbers}}
+
+        Built lazily on first use (eg. after loading from DB), then maintained
+        incrementally by the handlers that add, alter or remove rounds.
+        It is not a dataclass field, so it is never serialized.
+        """
+        index = getattr(self, "_pp", None)
+        if index is None:
+            index = {}
+            for number, round_ in enumerate(self.rounds, 1):
+                for table in round_.tables:
+                    for pair in predator_prey_pairs(table):
+                        index.setdefault(pair, set()).add(number)
+            self._pp = index
+        return index
+
+    def _seat_index(self, number: int) -> dict[str, tuple[int, int]]:
+        """Seats index of given round: {player_uid: (table_index, seat_index)}
+
+        Built lazily for each round, dropped when the round is altered or removed.
+        """
+        indexes = getattr(self, "_seats", None)
+        if indexes is None:
+            indexes = self._seats = {}
+        index = indexes.get(number)
+        if index is None:
+            index = indexes[number] = {
+                seat.player_uid: (i, j)
+                for i, table in enumerate(self.rounds[number - 1].tables)
+                for j, seat in enumerate(table.seating)
+            }
+        return index
+
+    def _find_seat(
+        self, number: int, player_uid: str
+    ) -> tuple[models.Table, models.TableSeat] | tuple[None, None]:
+        """Find the player's table and seat in given round, (None, None) if absent"""
+        position = self._seat_index(number).get(player_uid)
+        if position is None:
+            return None, None
+        table = self.rounds[number - 1].tables[position[0]]
+        return table, table.seating[position[1]]
+
+    def standings_index(self) -> "Standings":
+        """Standings index, built lazily.
+
+        Results changes and drops update it player by player,
+        it is dropped on other events changing the standings.
+        """
+        index = getattr(self, "_standings", None)
+        if index is None:
+            index = Standings(self)
+            self._standings = index
+        return index
+
+    def _update_standings(self, *uids: str) -> None:
+        index = getattr(self, "_standings", None)
+        if index is not None:
+            index.update(*uids)
+
+    def _index_round(self, number: int, remove: bool = False) -> None:
+        """Add (or remove) given round to (from) the predator-prey and seats indexes"""
+        getattr(self, "_seats", {}).pop(number, None)
+        index = getattr(self, "_pp", None)
+        if index is None:
+            return  # not built yet: it will be built from the rounds on first use
+        for table in self.rounds[number - 1].tables:
+            for pair in predator_prey_pairs(table):
+                if remove:
+                    rounds = index.get(pair, set())
+                    rounds.discard(number)
+                    if not rounds:
+                        index.pop(pair, None)
+                else:
+                    index.setdefault(pair, set()).add(number)
+
     def _event_seating_to_round(self, seating: list[list[str]]) -> models.Round:
         return models.Round(
             tables=[
@@ -346,21 +498,12 @@ class TournamentManager(models.Tournament):
 
     def set_result(self, ev: events.SetResult, member: models.Person) -> None:
         player = self.players[ev.player_uid]
-        round_ = self.rounds[ev.round - 1]
-        player_table = None
-        player_seat = None
-        for table in round_.tables:
-            for seat in table.seating:
-                if ev.player_uid == seat.player_uid:
-                    player_seat = seat
-                    player_table = table
-                    break
-            if player_seat is not None:
-                break
+        player_table, player_seat = self._find_seat(ev.round, ev.player_uid)
         if not player_seat:
             raise ValueError(f"player {ev.player_uid} not in round {ev.round}")
         player.result -= player_seat.result
-        player_seat.result = scoring.Score(vp=ev.vps)
+        # VPs are validated with the event
+        player_seat.result = scoring.Score.unchecked(vp=ev.vps)
         if self.is_judge(member):
             for seat in player_table.seating:
                 seat.judge = models.PublicPerson(**dataclasses.asdict(member))
@@ -396,40 +539,28 @@ class TournamentManager(models.Tournament):
             self.winner = top_seats[0].player_uid
         for s in table.seating:
             self.players[s.player_uid].result += s.result
+        self._update_standings(*(s.player_uid for s in table.seating))
 
     def set_deck(self, ev: events.SetDeck, member: models.Person, check=False) -> None:
-        if ev.deck.startswith("https://"):
-            deck = krcg.deck.Deck.from_url(ev.deck)
-        else:
-            deck = krcg.deck.Deck.from_txt(io.StringIO(ev.deck))
-        if check:
-            self._check_deck(ev, deck)
+        decks = self._event_decks()
+        krcg_deck = decks.get(ev.uid)
+        if krcg_deck is None:
+            parsed = parse_deck(ev.deck)
+            if check:
+                self._check_deck(ev, parsed.deck)
+            krcg_deck = parsed.model
+            if not krcg_deck.author and ev.attribution:
+                # parsed decks are cached and shared: copy it
+                krcg_deck = dataclasses.replace(krcg_deck, author=member.name)
+            decks[ev.uid] = krcg_deck
         player = self.players[ev.player_uid]
         if ev.round:
-            round_ = self.rounds[ev.round - 1]
-            for table in round_.tables:
-                for seat in table.seating:
-                    if ev.player_uid == seat.player_uid:
-                        deck_data = deck.to_json()
-                        if not deck_data.get("author", "") and ev.attribution:
-                            deck.author = member.name
-                            deck_data["author"] = member.name
-                        seat.deck = models.KrcgDeck(
-                            **deck_data,
-                            vdb_link=deck.to_vdb(),
-                        )
-                        break
-                else:
-                    continue
-                break
-            else:
+            _, seat = self._find_seat(ev.round, ev.player_uid)
+            if not seat:
                 raise ValueError(f"player {ev.player_uid} not in round {ev.round}")
+            seat.deck = krcg_deck
         else:
-            deck_data = deck.to_json()
-            if not deck_data.get("author", "") and ev.attribution:
-                deck_data["author"] = member.name
-                deck.author = member.name
-            player.deck = models.KrcgDeck(**deck_data, vdb_link=deck.to_vdb())
+            player.deck = krcg_deck
         if self.decklist_required:
             try:
                 player.barriers.remove(models.Barrier.MISSING_DECK)
@@ -457,6 +588,7 @@ class TournamentManager(models.Tournament):
 
     def drop(self, ev: events.Drop, member: models.Person) -> None:
         self.players[ev.player_uid].state = models.PlayerState.FINISHED
+        self._update_standings(ev.player_uid)
 
     def sanction(self, ev: events.Sanction, member: models.Person) -> None:
         self.sanctions.setdefault(ev.player_uid, [])
@@ -514,6 +646,7 @@ class TournamentManager(models.Tournament):
         self.state = models.TournamentState.FINALS
         self.finals_seeds = ev.seeds[:5]
         self.rounds.append(self._event_seating_to_round([self.finals_seeds[:]]))
+        self._index_round(len(self.rounds))
         seeds = set(ev.seeds)
         for player in self.players.values():
             if player.uid not in seeds:
@@ -581,14 +714,9 @@ class TournamentManager(models.Tournament):
                 else:
                     player.state = models.PlayerState.REGISTERED
             elif target_state == models.TournamentState.PLAYING:
-                in_last_round = any(
-                    seat.player_uid == player.uid
-                    for table in self.rounds[-1].tables
-                    for seat in table.seating
-                )
                 player.state = (
                     models.PlayerState.PLAYING
-                    if in_last_round
+                    if player.uid in self._seat_index(len(self.rounds))
                     else models.PlayerState.REGISTERED
                 )
             else:
@@ -779,6 +907,14 @@ class InvalidCheckInCode(TournamentError):
 class DeckIssue(TournamentError): ...
 
 
+class DeckUnavailable(DeckIssue):
+    def __init__(self, deck: str, detail: str):
+        super().__init__(deck, detail)
+
+    def __str__(self):
+        return f"Failed to get deck {self.args[0]}: {self.args[1]}"
+
+
 class ShortLibrary(DeckIssue):
     def __init__(self, ev: events.TournamentEvent, count: int):
         super().__init__(ev, count)
@@ -1109,18 +1245,14 @@ class TournamentOrchestrator(TournamentManager):
 
         This is the one forbidden thing in tournament seating (except in finals).
         """
-        pp = set()
-        for i, round_ in enumerate(self.rounds, 1):
-            if i == ignore or self._is_finals_round(i):
-                continue
-            for table in round_.tables:
-                for i, seat in enumerate(table.seating):
-                    prey = table.seating[(i + 1) % len(table.seating)].player_uid
-                    pp.add((seat.player_uid, prey))
+        index = self._pp_index()
+        skip = {ignore}
+        if self._is_finals_round(len(self.rounds)):
+            skip.add(len(self.rounds))
         for table in seating:
             for i, predator in enumerate(table):
                 prey = table[(i + 1) % len(table)]
-                if (predator, prey) in pp:
+                if index.get((predator, prey), set()) - skip:
                     raise PredatorPreyDuplicate(
                         ev,
                         (
@@ -1134,12 +1266,10 @@ class TournamentOrchestrator(TournamentManager):
     ):
         if round_number < 1 or round_number > len(self.rounds):
             raise BadRoundNumber(ev)
-        round_ = self.rounds[ev.round - 1]
-        for table in round_.tables:
-            for seat in table.seating:
-                if seat.player_uid == player_uid:
-                    return table, seat
-        raise PlayerAbsent(ev)
+        table, seat = self._find_seat(round_number, player_uid)
+        if not seat:
+            raise PlayerAbsent(ev)
+        return table, seat
 
     def set_result(self, ev: events.SetResult, member: models.Person) -> None:
         if ev.player_uid not in self.players:
@@ -1260,42 +1390,173 @@ class TournamentOrchestrator(TournamentManager):
 # ################################################################ Convenience functions
 
 
-def standings(tournament: models.TournamentInfo) -> list[tuple[int, models.PlayerInfo]]:
-    def sort_key(p: models.Player):
-        return (
-            # dropouts go last (only matters when tournament in progress)
-            int(p.state == models.PlayerState.FINISHED),
-            # winner first
-            -int(p.uid == tournament.winner),
-            # then finalists (higher score can have dropped out)
-            -int(p.uid in tournament.finals_seeds),
-            -p.result.gw,
-            -p.result.vp,
-            -p.result.tp,
-            p.toss,
-        )
+def predator_prey_pairs(table: models.Table) -> typing.Iterator[tuple[str, str]]:
+    """Yields the (predator_uid, prey_uid) pairs of a table"""
+    for i, seat in enumerate(table.seating):
+        yield seat.player_uid, table.seating[(i + 1) % len(table.seating)].player_uid
+
+
+@dataclasses.dataclass
+class Changes:
+    """Parts of a tournament changed by events.
+
+    Tables are given as (round index, table index). If `full` is set,
+    the changes are not tracked: the whole tournament must be written.
+    """
 
-    sorted_players = sorted(
-        (p for p in tournament.players.values() if p.rounds_played), key=sort_key
+    full: bool = False
+    fields: set[str] = dataclasses.field(default_factory=set)
+    players: set[str] = dataclasses.field(default_factory=set)
+    tables: set[tuple[int, int]] = dataclasses.field(default_factory=set)
+
+
+#: Events that do not change the standings, or update the standings index
+STANDINGS_NEUTRAL_EVENTS = {
+    events.EventType.SET_RESULT,
+    events.EventType.SET_DECK,
+    events.EventType.DROP,
+    events.EventType.OVERRIDE,
+    events.EventType.UNOVERRIDE,
+}
+
+
+def _standings_key(tournament: models.TournamentInfo, p: models.PlayerInfo):
+    return (
+        # dropouts go last (only matters when tournament in progress)
+        int(p.state == models.PlayerState.FINISHED),
+        # winner first
+        -int(p.uid == tournament.winner),
+        # then finalists (higher score can have dropped out)
+        -int(p.uid in tournament.finals_seeds),
+        -p.result.gw,
+        -p.result.vp,
+        -p.result.tp,
+        p.toss,
     )
-    rank = 1
-    res = []
-    if tournament.state == models.TournamentState.FINISHED:
-        finalists = 0
-    else:
-        finalists = 5
-    for _, players in itertools.groupby(sorted_players, key=sort_key):
-        players = list(players)
-        res.extend([rank, p] for p in players)
-        if rank < 3 and finalists < 5:
-            finalists += len(players)
-            if finalists < 5:
-                rank = 2
-            else:
-                rank = 6
+
+
+class Standings:
+    """Players who played, sorted by standings.
+
+    Can be updated player by player when their result changes (no full sort),
+    ranks are computed on demand.
+    """
+
+    def __init__(self, tournament: models.TournamentInfo):
+        self.tournament = tournament
+        self.keys = {
+            p.uid: _standings_key(tournament, p)
+            for p in tournament.players.values()
+            if p.rounds_played
+        }
+        self.sorted = sorted((key, uid) for uid, key in self.keys.items())
+        self._ranked = None
+        self._ranks = None
+
+    def update(self, *uids: str) -> None:
+        """Update the position of given players"""
+        for uid in uids:
+            key = self.keys.pop(uid, None)
+            if key is not None:
+                del self.sorted[bisect.bisect_left(self.sorted, (key, uid))]
+            player = self.tournament.players.get(uid)
+            if player and player.rounds_played:
+                key = _standings_key(self.tournament, player)
+                self.keys[uid] = key
+                bisect.insort(self.sorted, (key, uid))
+        self._ranked = None
+        self._ranks = None
+
+    def ranked(self) -> list[tuple[int, models.PlayerInfo]]:
+        """All players with their rank"""
+        if self._ranked is not None:
+            return self._ranked
+        self._ranked = []
+        rank = 1
+        if self.tournament.state == models.TournamentState.FINISHED:
+            finalists = 0
         else:
-            rank += len(players)
-    return res
+            finalists = 5
+        for _, entries in itertools.groupby(self.sorted, key=lambda e: e[0]):
+            players = [self.tournament.players[uid] for _, uid in entries]
+            self._ranked.extend((rank, p) for p in players)
+            if rank < 3 and finalists < 5:
+                finalists += len(players)
+                if finalists < 5:
+                    rank = 2
+                else:
+                    rank = 6
+            else:
+                rank += len(players)
+        return self._ranked
+
+    def top(self, n: int) -> list[tuple[int, models.PlayerInfo]]:
+        """Players ranked n or better"""
+        return list(itertools.takewhile(lambda e: e[0] <= n, self.ranked()))
+
+    def cutoff(self, n: int = 5) -> scoring.Score:
+        """Result of the best player ranked below n (the last player if none)"""
+        ranked = self.ranked()
+        for rank, player in ranked:
+            if rank > n:
+                return player.result
+        return ranked[-1][1].result if ranked else scoring.Score()
+
+    def rank(self, uid: str) -> int:
+        """Rank of given player, 0 if they did not play"""
+        if self._ranks is None:
+            self._ranks = {p.uid: rank for rank, p in self.ranked()}
+        return self._ranks.get(uid, 0)
+
+
+def standings_index(tournament: models.TournamentInfo) -> Standings:
+    """Maintained by the tournament manager, built (full sort) otherwise"""
+    if isinstance(tournament, TournamentManager):
+        return tournament.standings_index()
+    return Standings(tournament)
+
+
+def standings(tournament: models.TournamentInfo) -> list[tuple[int, models.PlayerInfo]]:
+    return list(standings_index(tournament).ranked())
+
+
+#: Bump when the ratings computation changes, to invalidate the persisted ratings
+RATINGS_VERSION = 1
+RATING_COEF_BONUS = {models.TournamentRank.NC: 0.25, models.TournamentRank.CC: 1}
+TOURNAMENT_REF_FIELDS = dataclasses.fields(models.TournamentRef)
+
+
+def ratings_version(tournament: models.TournamentInfo) -> str:
+    """Hash of the tournament data its ratings depend on"""
+    return hashlib.sha256(
+        orjson.dumps(
+            [
+                RATINGS_VERSION,
+                tournament.uid,
+                tournament.name,
+                tournament.format,
+                tournament.online,
+                tournament.start,
+                tournament.timezone,
+                tournament.rank,
+                tournament.state,
+                tournament.winner,
+                tournament.finals_seeds,
+                sorted(
+                    (
+                        p.uid,
+                        p.state,
+                        p.rounds_played,
+                        p.result.gw,
+                        p.result.vp,
+                        p.result.tp,
+                        p.toss,
+                    )
+                    for p in tournament.players.values()
+                ),
+            ]
+        )
+    ).hexdigest()
 
 
 def ratings(tournament: models.TournamentInfo) -> dict[str, models.TournamentRating]:
@@ -1307,11 +1568,10 @@ def ratings(tournament: models.TournamentInfo) -> dict[str, models.TournamentRat
     ret = {}
     if not size:
         return ret
-    coef = math.log(size * size, 15) - 1
-    if tournament.rank in [models.TournamentRank.NC]:
-        coef += 0.25
-    elif tournament.rank == models.TournamentRank.CC:
-        coef += 1
+    coef = math.log(size * size, 15) - 1 + RATING_COEF_BONUS.get(tournament.rank, 0)
+    ref = models.TournamentRef(
+        **{f.name: getattr(tournament, f.name) for f in TOURNAMENT_REF_FIELDS}
+    )
     for rank, player in standings(tournament):
         rating_points = 5 + 4 * player.result.vp + 8 * player.result.gw
         gp_points = 3
@@ -1324,7 +1584,7 @@ def ratings(tournament: models.TournamentInfo) -> dict[str, models.TournamentRat
         elif rank <= 10:
             gp_points = (10 - rank) + 6
         ret[player.uid] = models.TournamentRating(
-            tournament=models.TournamentRef(**dataclasses.asdict(tournament)),
+            tournament=ref,
             size=size,
             rounds_played=player.rounds_played,
             result=player.result,
@@ -1335,6 +1595,67 @@ def ratings(tournament: models.TournamentInfo) -> dict[str, models.TournamentRat
     return ret
 
 
+def bulk_ratings(
+    tournament: numpy.ndarray,
+    coef_bonus: numpy.ndarray,
+    dropped: numpy.ndarray,
+    winner: numpy.ndarray,
+    finalist: numpy.ndarray,
+    gw: numpy.ndarray,
+    vp: numpy.ndarray,
+    tp: numpy.ndarray,
+    toss: numpy.ndarray,
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Vectorised `ratings` for many finished tournaments at once.
+
+    Takes one entry per participant (rounds_played > 0): the `tournament` index,
+    and the standings criteria. `coef_bonus` is indexed by tournament (rank bonus).
+    Returns the size, rank, rating points and GP points of each entry.
+    """
+    count = len(tournament)
+    keys = numpy.stack([tournament, dropped, winner, finalist, gw, vp, tp, toss])
+    keys = keys.astype(numpy.float64)
+    # same order as `standings`
+    order = numpy.lexsort((keys[7], *-keys[6:1:-1], keys[1], keys[0]))
+    keys = keys[:, order]
+    position = numpy.arange(count)
+    new_tournament = numpy.ones(count, dtype=bool)
+    new_tournament[1:] = keys[0, 1:] != keys[0, :-1]
+    new_group = numpy.ones(count, dtype=bool)
+    new_group[1:] = numpy.any(keys[:, 1:] != keys[:, :-1], axis=0)
+    tournament_id = numpy.cumsum(new_tournament) - 1
+    group_id = numpy.cumsum(new_group) - 1
+    # players ranked before the group, and up to the end of the group
+    before = numpy.maximum.accumulate(numpy.where(new_group, position, 0))
+    before -= numpy.maximum.accumulate(numpy.where(new_tournament, position, 0))
+    end = before + numpy.bincount(group_id)[group_id]
+    # winner is 1st, finalists 2nd, then ranks start at 6 after the finalists
+    finalists = numpy.full(tournament_id[-1] + 1 if count else 0, numpy.inf)
+    numpy.minimum.at(finalists, tournament_id, numpy.where(end >= 5, end, numpy.inf))
+    rank = numpy.where(
+        before == 0,
+        1,
+        numpy.where(before < 5, 2, 6 + before - finalists[tournament_id]),
+    ).astype(numpy.int64)
+    size = numpy.bincount(tournament_id)[tournament_id]
+    coef = (
+        numpy.log(size * size) / math.log(15)
+        - 1
+        + coef_bonus[keys[0].astype(numpy.int64)]
+    )
+    rating_points = 5 + 4 * keys[5] + 8 * keys[4]
+    rating_points += numpy.where(rank == 1, numpy.round(90 * coef), 0)
+    rating_points += numpy.where(rank == 2, numpy.round(30 * coef), 0)
+    gp_points = numpy.where(
+        rank == 1, 25, numpy.where(rank == 2, 15, numpy.where(rank <= 10, 16 - rank, 3))
+    )
+    # back to the original order
+    res = [numpy.empty(count, dtype=numpy.int64) for _ in range(4)]
+    for array, values in zip(res, [size, rank, rating_points, gp_points]):
+        array[order] = values
+    return tuple(res)
+
+
 def toss_for_finals(tournament: models.Tournament) -> tuple[list[str], dict[str, int]]:
     random.seed()
     toss = {}
@@ -1345,15 +1666,24 @@ def toss_for_finals(tournament: models.Tournament) -> tuple[list[str], dict[str,
         for p, t in zip(players, samples):
             p.toss = t
             toss[p.uid] = t
+    if isinstance(tournament, TournamentManager):
+        tournament._standings = None
     return [p.uid for _, p in standings(tournament)[:5]], toss
 
 
 def next_round_seating(tournament: models.Tournament):
     """Compute next round's seating"""
     players = [
-        p for p in tournament.players if p.state == models.PlayerState.CHECKED_IN
+        p.uid
+        for p in tournament.players.values()
+        if p.state == models.PlayerState.CHECKED_IN
     ]
     random.shuffle(players)
+    return _seat_players(players)
+
+
+def _seat_players(players: list[str]) -> models.Round:
+    """Seat players in order, on 5-seats tables first"""
     # N is the number of players, seat them as much as you can on 5-seats-tables,
     # remains [N % 5] non-seated players. Take one player per 5 seats-tables
     # until you make this 4 seats. You take from [4 - (N % 5)] tables,
@@ -1362,18 +1692,155 @@ def next_round_seating(tournament: models.Tournament):
     players_count = len(players)
     seat_in_fives = players_count - 4 * (5 - (players_count % 5 or 5))
     seated = 0
-    res = models.Round()
+    res = models.Round(tables=[])
     while seated < players_count:
         seats = 5 if seated < seat_in_fives else 4
         res.tables.append(
             models.Table(
-                seating=[models.TableSeat(p) for p in players[seated : seated + seats]]
+                seating=[
+                    models.TableSeat(uid) for uid in players[seated : seated + seats]
+                ]
             )
         )
         seated += seats
     return res
 
 
+@functools.cache
+def seating_library() -> dict[int, dict[int, list[tuple[int, ...]]]]:
+    """Precomputed optimal seatings: {players_count: {rounds_count: rounds}}
+
+    Each round lists the players numbers (1 to N) in seating order,
+    see scripts/seating_library.py for the binary format.
+    """
+    path = importlib.resources.files("archon") / "seatingdata" / "optimal_seating.bin"
+    data = zlib.decompress(path.read_bytes())
+    res = collections.defaultdict(dict)
+    offset = 0
+    while offset < len(data):
+        players_count, rounds_count = struct.unpack_from("<HB", data, offset)
+        offset += 3
+        rounds = []
+        for _ in range(rounds_count):
+            rounds.append(struct.unpack_from(f"<{players_count}H", data, offset))
+            offset += 2 * players_count
+        res[players_count][rounds_count] = rounds
+    return dict(res)
+
+
+def template_seating(tournament: models.Tournament) -> models.Round | None:
+    """Compute next round's seating from the precomputed optimal seatings.
+
+    Players are numbered by their seat in the first round. This is only possible
+    if the checked-in players are exactly the ones who played the previous rounds,
+    and those rounds followed the precomputed seating.
+    Returns None if there is no matching precomputed seating.
+    """
+    if not tournament.rounds:
+        return None
+    players = [s.player_uid for t in tournament.rounds[0].tables for s in t.seating]
+    checked_in = {
+        p.uid
+        for p in tournament.players.values()
+        if p.state == models.PlayerState.CHECKED_IN
+    }
+    if len(checked_in) != len(players) or checked_in.difference(players):
+        return None
+    available = seating_library().get(len(players), {})
+    rounds_count = min(
+        (
+            c
+            for c in available
+            if c >= max(tournament.max_rounds, len(tournament.rounds) + 1)
+        ),
+        default=0,
+    )
+    if not rounds_count:
+        return None
+    template = [
+        _seat_players([players[n - 1] for n in r]) for r in available[rounds_count]
+    ]
+    for round_, expected in zip(tournament.rounds, template):
+        if [[s.player_uid for s in t.seating] for t in round_.tables] != [
+            [s.player_uid for s in t.seating] for t in expected.tables
+        ]:
+            return None
+    return template[len(tournament.rounds)]
+
+
+@dataclasses.dataclass
+class ParsedDeck:
+    """A parsed deck (for checks) and its model, or the parsing error"""
+
+    deck: krcg.deck.Deck | None = None
+    model: models.KrcgDeck | None = None
+    error: str = ""
+    expires: float = math.inf
+
+
+#: Parsed decks by URL or text hash, most recently used last
+DECK_CACHE: collections.OrderedDict[str, ParsedDeck] = collections.OrderedDict()
+DECK_CACHE_SIZE = 1000
+DECK_CACHE_LOCK = threading.Lock()
+#: failures are kept shortly (seconds), so the event handler does not fetch again
+DECK_ERROR_TTL = 60
+
+
+def parse_deck(deck: str, refresh: bool = False) -> ParsedDeck:
+    """Parse a deck builder URL or plain text decklist.
+
+    Parsed decks are cached and shared, they must not be modified.
+    URLs are fetched on cache miss, or every time on refresh. This is blocking:
+    call it in a thread to prefetch the deck before handling the event.
+    Raises DeckUnavailable if the deck could not be fetched or parsed.
+    """
+    url = deck.startswith("https://")
+    key = deck if url else hashlib.sha256(deck.encode()).hexdigest()
+    with DECK_CACHE_LOCK:
+        ret = DECK_CACHE.get(key)
+        if ret and ret.expires < time.monotonic():
+            del DECK_CACHE[key]
+            ret = None
+        if ret and not (url and refresh):
+            DECK_CACHE.move_to_end(key)
+            if ret.error:
+                raise DeckUnavailable(deck, ret.error)
+            return ret
+    try:
+        if url:
+            parsed = krcg.deck.Deck.from_url(deck)
+        else:
+            parsed = krcg.deck.Deck.from_txt(io.StringIO(deck))
+        ret = ParsedDeck(
+            deck=parsed,
+            model=models.KrcgDeck(**parsed.to_json(), vdb_link=parsed.to_vdb()),
+        )
+    except Exception as err:
+        LOG.info("Failed to parse deck %s", deck, exc_info=True)
+        ret = ParsedDeck(
+            error=str(err) or type(err).__name__,
+            expires=time.monotonic() + DECK_ERROR_TTL,
+        )
+    with DECK_CACHE_LOCK:
+        DECK_CACHE[key] = ret
+        DECK_CACHE.move_to_end(key)
+        while len(DECK_CACHE) > DECK_CACHE_SIZE:
+            DECK_CACHE.popitem(last=False)
+    if ret.error:
+        raise DeckUnavailable(deck, ret.error)
+    return ret
+
+
+def prefetch_deck(deck: str, refresh: bool = False) -> None:
+    """Parse the deck in cache (see parse_deck), to be called in a thread.
+    Failures are cached too: the event handler raises them without fetching again.
+    """
+    try:
+        parse_deck(deck, refresh)
+    except DeckUnavailable:
+        pass
+
+
 def round_to_krcg_round(round_: models.Round):
     return krcg.seating.Round(
         [s.player_uid for s in table.seating] for table in round_.tables
@@ -1383,7 +1850,7 @@ def round_to_krcg_round(round_: models.Round):
 def optimise_full_seating(
     tournament: models.Tournament, round_: models.Round
 ) -> krcg.seating.Score:
-    if any(s.result for table in round_.tables for s in table.seating):
+    if any(s.result.vp for table in round_.tables for s in table.seating):
         raise ResultRecorded()
     rounds = [round_to_krcg_round(r) for r in tournament.rounds]
     rounds.append(round_to_krcg_round(round_))
@@ -1457,19 +1924,3 @@ def deck_infos(
     if tournament.decklists_mode == models.DeckListsMode.FINALISTS:
         return [info for info in res[:5] if info.finalist]
     return [info for info in res[:1] if info.winner]
-
-
-def filter_tournament_for_member(
-    tournament: models.TournamentInfo, member_uid: str
-) -> None:
-    """Strip other players' deck data in place. The requesting member keeps
-    their own deck (so they can see their upload status) and their own per-round
-    seat decks (multideck case)."""
-    for uid, player in tournament.players.items():
-        if uid != member_uid:
-            player.deck = None
-    for round_ in tournament.rounds:
-        for table in round_.tables:
-            for seat in table.seating:
-                if seat.player_uid != member_uid:
-                    seat.deck = None
@@ -136,7 +136,7 @@ class SetResult(Event):
     type: typing.Literal[EventType.SET_RESULT]
     player_uid: str
     round: int
-    vps: float
+    vps: float = pydantic.Field(ge=0, multiple_of=0.5)
 
 
 @dataclasses.dataclass(kw_only=True)
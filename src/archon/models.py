@@ -264,6 +264,31 @@ class TableSeat(SeatInfo):
     judge: PublicPerson | None = None  # Players cannot modify results set by a judge
 
 
+@dataclasses.dataclass
+class PlayerSeat:
+    """A player's seat in a tournament round: numbers start at 1"""
+
+    tournament_uid: str
+    round: int
+    table: int
+    seat: int
+    result: scoring.Score
+    table_state: TableState
+
+
+@dataclasses.dataclass
+class MemberRanking:
+    """A member's rank in a ranking category (banned members are not ranked)"""
+
+    rank: int
+    uid: str
+    vekn: str
+    name: str
+    country: str
+    country_flag: str
+    points: int
+
+
 @dataclasses.dataclass
 class ScoreOverride:
     judge: Person
@@ -382,6 +407,13 @@ class TournamentInfo(TournamentConfig):
     winner: str = ""
 
 
+@dataclasses.dataclass
+class EventOutcome:
+    uid: str  # event uid
+    success: bool = True
+    detail: str = ""  # error message if the event was rejected
+
+
 # note: cannot use dataclass as query param
 class TournamentFilter(pydantic.BaseModel):
     date: str = ""
@@ -394,6 +426,15 @@ class TournamentFilter(pydantic.BaseModel):
     name: str | None = None
 
 
+class MemberFilter(pydantic.BaseModel):
+    q: str = ""  # name search
+    vekn: str = ""  # VEKN ID prefix
+    country: str = ""
+    # cursor of the next page
+    score: float | None = None
+    uid: str = ""
+
+
 @dataclasses.dataclass
 class VenueCompletion:
     venue: str
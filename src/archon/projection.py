@@ -0,0 +1,103 @@
+"""Tournament views, projected from the live model.
+
+Builds the JSON-ready data of the public views (`TournamentConfig`,
+`TournamentInfo`) directly from a tournament, without copying it (`asdict`)
+nor validating it again. Nested dataclasses shared by the views (scores, decks,
+persons) are left for orjson to serialize as they are.
+"""
+
+import dataclasses
+import orjson
+import typing
+
+from . import models
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _names(cls: type) -> tuple[str, ...]:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+CONFIG_FIELDS = _names(models.TournamentConfig)
+TOURNAMENT_FIELDS = _names(models.Tournament)
+PUBLIC_PERSON_FIELDS = _names(models.PublicPerson)
+PLAYER_INFO_FIELDS = _names(models.PlayerInfo)
+#: read-only, for players whose results are not provided
+PLAYER_INFO_DEFAULTS = {
+    k: v
+    for k, v in dataclasses.asdict(models.PlayerInfo(name="")).items()
+    if k not in PUBLIC_PERSON_FIELDS
+}
+
+
+def dumps(data: typing.Any) -> bytes:
+    """Same output as the pydantic JSON serialization of the models"""
+    return orjson.dumps(data, option=OPTIONS)
+
+
+def _project(obj: typing.Any, names: tuple[str, ...]) -> dict[str, typing.Any]:
+    return {name: getattr(obj, name) for name in names}
+
+
+def tournament_data(tournament: models.Tournament) -> dict[str, typing.Any]:
+    """Full tournament, fields only (no manager indexes)"""
+    return _project(tournament, TOURNAMENT_FIELDS)
+
+
+def tournament_config(tournament: models.TournamentConfig) -> dict[str, typing.Any]:
+    return _project(tournament, CONFIG_FIELDS)
+
+
+def _player_info(
+    player: models.PlayerInfo, deck: bool, score: bool
+) -> dict[str, typing.Any]:
+    if not score:
+        # public information only, the rest is left to the default values
+        return _project(player, PUBLIC_PERSON_FIELDS) | PLAYER_INFO_DEFAULTS
+    data = _project(player, PLAYER_INFO_FIELDS)
+    if not deck:
+        data["deck"] = None
+    return data
+
+
+def tournament_info(
+    tournament: models.TournamentInfo,
+    member_uid: str | None = None,
+    scores: typing.Container[str] | None = None,
+) -> dict[str, typing.Any]:
+    """Public tournament information, as seen by the given member.
+
+    Other players' decks are stripped: the member keeps their own deck
+    (so they can see their upload status) and their own per-round seat decks.
+    If `scores` is given, only these players results are provided.
+    """
+    data = _project(tournament, CONFIG_FIELDS)
+    data["players"] = {
+        uid: _player_info(player, uid == member_uid, scores is None or uid in scores)
+        for uid, player in tournament.players.items()
+    }
+    data["finals_seeds"] = tournament.finals_seeds
+    data["rounds"] = [
+        {
+            "tables": [
+                {
+                    "seating": [
+                        {
+                            "player_uid": seat.player_uid,
+                            "result": seat.result,
+                            "deck": (
+                                seat.deck if seat.player_uid == member_uid else None
+                            ),
+                        }
+                        for seat in table.seating
+                    ],
+                    "state": table.state,
+                }
+                for table in round_.tables
+            ]
+        }
+        for round_ in tournament.rounds
+    ]
+    data["winner"] = tournament.winner
+    return data
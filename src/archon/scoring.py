@@ -2,17 +2,29 @@ import itertools
 import logging
 import math
 import pydantic
+import typing
 from pydantic import dataclasses
 
 LOG = logging.getLogger()
 
 
-@dataclasses.dataclass(order=True, eq=True)
+@dataclasses.dataclass(order=True, eq=True, slots=True)
 class Score:
+    """Validated on construction (API, DB), arithmetic does not validate again"""
+
     gw: int = pydantic.Field(0, ge=0)
     vp: float = pydantic.Field(0.0, ge=0, multiple_of=0.5)
     tp: int = pydantic.Field(0, ge=0)
 
+    @classmethod
+    def unchecked(cls, gw: int = 0, vp: float = 0.0, tp: int = 0) -> "Score":
+        """Build a score without validation, from values known to be valid"""
+        score = object.__new__(cls)
+        score.gw = gw
+        score.vp = vp
+        score.tp = tp
+        return score
+
     def __str__(self):
         if self.gw:
             return f"{self.gw}GW{self.vp:.2g} ({self.tp}TP)"
@@ -20,9 +32,7 @@ class Score:
             return f"{self.vp:.2g}VP ({self.tp}TP)"
 
     def __add__(self, rhs):
-        return self.__class__(
-            gw=self.gw + rhs.gw, vp=self.vp + rhs.vp, tp=self.tp + rhs.tp
-        )
+        return self.unchecked(self.gw + rhs.gw, self.vp + rhs.vp, self.tp + rhs.tp)
 
     def __iadd__(self, rhs):
         self.gw += rhs.gw
@@ -31,10 +41,8 @@ class Score:
         return self
 
     def __sub__(self, rhs):
-        return self.__class__(
-            gw=max(0, self.gw - rhs.gw),
-            vp=max(0, self.vp - rhs.vp),
-            tp=max(0, self.tp - rhs.tp),
+        return self.unchecked(
+            max(0, self.gw - rhs.gw), max(0, self.vp - rhs.vp), max(0, self.tp - rhs.tp)
         )
 
     def __isub__(self, rhs):
@@ -48,32 +56,44 @@ def compute_table_scores(scores: list[Score]) -> float:
     """Compute GW and TPs based on provided VPs, return the maximum VPs scored.
     Check the VPs first with check_table_vps()
     """
+    vps = tuple(s.vp for s in scores)
+    max_vp, results = TABLE_SCORES.get(vps) or _table_scores(vps)
+    for score, (gw, tp) in zip(scores, results):
+        score.gw = gw
+        score.tp = tp
+    return max_vp
+
+
+def _table_scores(
+    vps: tuple[float, ...],
+) -> tuple[float, tuple[tuple[int, int], ...]]:
+    """Maximum VPs scored, and the (GW, TP) of each seat"""
     # we're not checking table size here, so try and handle illegal sizes in some way
     # for more than 5 players, just augment the tps 12 by 12
     # table sizes are checked in check_table_vps though, so the score only counts
     # if it gets overriden by a judge
-    tps = [t for _, t in zip(range(max(5, len(scores))), itertools.count(12, 12))]
-    if len(scores) < 5:
+    tps = [t for _, t in zip(range(max(5, len(vps))), itertools.count(12, 12))]
+    if len(vps) < 5:
         tps.pop(2)
         # for less than 4, remove the lowest scores, so it stays relevant
-        tps = tps[4 - len(scores) :]
-    assert len(tps) == len(scores)
-    scores_by_vps = sorted(scores, key=lambda x: x.vp)
+        tps = tps[4 - len(vps) :]
+    assert len(tps) == len(vps)
+    results = [None] * len(vps)
+    seats_by_vps = sorted(range(len(vps)), key=lambda i: vps[i])
     # iter over scores in rising order, group by vp count
-    for vp, results in itertools.groupby(scores_by_vps, lambda x: x.vp):
+    for vp, seats in itertools.groupby(seats_by_vps, lambda i: vps[i]):
         # multiple players can have the same vp count: they shares TPs
         # for the positions they cover
-        results = list(results)
-        tp = sum(tps.pop(0) for _ in range(len(results))) // len(results)
+        seats = list(seats)
+        tp = sum(tps.pop(0) for _ in range(len(seats))) // len(seats)
         # only highest score over 2 (last group = highest vp,
-        if vp >= 2 and len(results) == 1 and len(tps) == 0:
+        if vp >= 2 and len(seats) == 1 and len(tps) == 0:
             gw = 1
         else:
             gw = 0
-        for r in results:
-            r.gw = gw
-            r.tp = tp
-    return vp
+        for i in seats:
+            results[i] = (gw, tp)
+    return vp, tuple(results)
 
 
 class ScoringError(ValueError): ...
@@ -96,20 +116,31 @@ class MissingHalfVP(ScoringError): ...
 
 def check_table_vps(scores: list[Score]) -> ScoringError | None:
     """Check VPs validity on a table"""
+    vps = tuple(s.vp for s in scores)
+    try:
+        error = VALIDITY[vps]
+    except KeyError:
+        error = _check_vps(vps)
+    return error and error[0](*error[1])
+
+
+def _check_vps(
+    vps: tuple[float, ...],
+) -> tuple[type[ScoringError], tuple[str, ...]] | None:
+    """Check VPs validity on a table, returns the error class and arguments"""
     # check table size
-    if len(scores) < 4 or len(scores) > 5:
-        return InvalidTableSize()
+    if len(vps) < 4 or len(vps) > 5:
+        return InvalidTableSize, ()
     # checking the total is easy, just ceil the half points and total is table size
-    total = sum(math.ceil(s.vp) for s in scores)
-    if total < len(scores):
-        return InsufficientTotal()
-    if total > len(scores):
-        return ExcessiveTotal()
-    vps = [[i, s.vp] for i, s in enumerate(scores)]
+    total = sum(math.ceil(vp) for vp in vps)
+    if total < len(vps):
+        return InsufficientTotal, ()
+    if total > len(vps):
+        return ExcessiveTotal, ()
+    vps = [[i, vp] for i, vp in enumerate(vps)]
     # go through all ousts successively: we begin anywhere on the table
     # and search for a zero (which means an oust, otherwise it would be 0.5)
     while len(vps) > 0:
-        LOG.debug("scores check pass: %s", vps)
         for j, (idx, vp_count) in enumerate(vps):
             # each oust (vp_count == 0), remove 1 vp from predator ("account" for it)
             # and remove the item from the vps list.
@@ -121,7 +152,7 @@ def check_table_vps(scores: list[Score]) -> ScoringError | None:
                 # that would mean we were in a [0.5, <=0] situation previous loop:
                 # a half-point score followed by an oust, missing a point
                 if vp_count % 1:
-                    return MissingVP(f"missing VP for seat {idx + 1}")
+                    return MissingVP, (f"missing VP for seat {idx + 1}",)
                 vps[(j - 1) % len(vps)][1] += vp_count - 1
                 vps.pop(j)
                 break
@@ -132,13 +163,37 @@ def check_table_vps(scores: list[Score]) -> ScoringError | None:
             if all([vp == 0.5 for _, vp in vps]):
                 # there must be more than one
                 if len(vps) == 1:
-                    return MissingHalfVP(f"Seat {vps[0][0] + 1} cannot timeout alone")
+                    return MissingHalfVP, (
+                        f"Seat {vps[0][0] + 1} cannot timeout alone",
+                    )
             # remove all 0.5
             vps = [[i, vp] for i, vp in vps if vp != 0.5]
             # we can still have one standing if the 0.5 were withdrawals, but not more
             if len(vps) > 1:
-                return MissingHalfVP(
-                    f"Missing half vps for seats {[i + 1 for i, _ in vps]}"
+                return MissingHalfVP, (
+                    f"Missing half vps for seats {[i + 1 for i, _ in vps]}",
                 )
             # if there is one left, he has 1 point (because of the total check)
             break
+
+
+def _table_vps(size: int) -> typing.Iterator[tuple[float, ...]]:
+    """All possible VPs on a table (0.5 steps), up to a total of `size` (ceiled)"""
+    for ceils in itertools.product(range(size + 1), repeat=size):
+        if sum(ceils) > size:
+            continue
+        yield from itertools.product(
+            *([0.0] if c == 0 else [c - 0.5, float(c)] for c in ceils)
+        )
+
+
+#: precomputed check_table_vps() and compute_table_scores() results
+#: for all 4 and 5 seats tables with no excessive total
+VALIDITY: dict[tuple[float, ...], tuple[type[ScoringError], tuple[str, ...]] | None]
+VALIDITY = {}
+TABLE_SCORES: dict[tuple[float, ...], tuple[float, tuple[tuple[int, int], ...]]]
+TABLE_SCORES = {}
+for _size in [4, 5]:
+    for _vps in _table_vps(_size):
+        VALIDITY[_vps] = _check_vps(_vps)
+        TABLE_SCORES[_vps] = _table_scores(_vps)
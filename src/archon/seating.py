@@ -0,0 +1,139 @@
+"""Seating optimisation, off the event loop.
+
+The krcg optimiser is CPU bound: it runs in a pool of processes so that a judge
+optimising a big event does not stall the other requests served by the worker.
+Independent restarts run in parallel, the best seating found within the time budget
+is kept.
+"""
+
+import asyncio
+import concurrent.futures
+import dotenv
+import krcg.seating
+import logging
+import multiprocessing
+import os
+import time
+
+from . import engine
+from . import models
+
+dotenv.load_dotenv()
+SEATING_WORKERS = int(os.getenv("SEATING_WORKERS", os.cpu_count() or 1))
+SEATING_BUDGET = float(os.getenv("SEATING_BUDGET", "10"))  # seconds
+ITERATIONS = 20000
+LOG = logging.getLogger()
+POOL: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def get_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global POOL
+    if POOL is None:
+        # do not fork the server process (threads, DB connections)
+        POOL = concurrent.futures.ProcessPoolExecutor(
+            SEATING_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return POOL
+
+
+def shutdown() -> None:
+    global POOL
+    if POOL is not None:
+        POOL.shutdown(wait=False, cancel_futures=True)
+        POOL = None
+
+
+class _Expired(Exception): ...
+
+
+def _restart(
+    rounds: list[krcg.seating.Round], fixed: int, iterations: int, deadline: float
+) -> tuple[list[krcg.seating.Round], krcg.seating.Score] | None:
+    """One optimisation, None if it did not finish before the deadline (wall clock)"""
+
+    def check_deadline(**_kwargs) -> None:
+        if time.time() > deadline:
+            raise _Expired()
+
+    try:
+        return krcg.seating.optimise(
+            rounds, iterations=iterations, fixed=fixed, callback=check_deadline
+        )
+    except _Expired:
+        return None
+
+
+async def optimise(
+    rounds: list[krcg.seating.Round],
+    fixed: int,
+    budget: float | None = None,
+    parallel: int | None = None,
+    iterations: int = ITERATIONS,
+) -> tuple[list[krcg.seating.Round], krcg.seating.Score]:
+    """Optimise the seating of the rounds after the `fixed` first ones.
+
+    Runs `parallel` restarts at a time (one per worker by default), and keeps
+    launching new ones as long as they can finish within the budget (in seconds).
+    The restarts still running at the end of the budget are stopped: if none
+    finished, the rounds are returned as they are.
+    """
+    loop = asyncio.get_running_loop()
+    budget = SEATING_BUDGET if budget is None else budget
+    parallel = parallel or SEATING_WORKERS
+    start = loop.time()
+    deadline = start + budget
+    # the workers check the deadline on their own (wall) clock
+    wall_deadline = time.time() + budget
+    pool = get_pool()
+    pending = {
+        loop.run_in_executor(pool, _restart, rounds, fixed, iterations, wall_deadline)
+        for _ in range(parallel)
+    }
+    best = None
+    duration = 0
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0, deadline - loop.time()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for future in done:
+                result = future.result()
+                if result is None:
+                    continue
+                if best is None or result[1].total < best[1].total:
+                    best = result
+            # restarts run concurrently: the first results give their duration
+            duration = duration or loop.time() - start
+            while len(pending) < parallel and loop.time() + duration < deadline:
+                pending.add(
+                    loop.run_in_executor(
+                        pool, _restart, rounds, fixed, iterations, wall_deadline
+                    )
+                )
+    finally:
+        for future in pending:
+            future.cancel()
+    if best is None:
+        LOG.warning("Seating not optimised within the %.2fs budget", budget)
+        return rounds, krcg.seating.Score(rounds)
+    LOG.debug("Seating optimised in %.2fs: %s", loop.time() - start, best[1])
+    return best
+
+
+async def optimise_full_seating(
+    tournament: models.Tournament, round_: models.Round, budget: float | None = None
+) -> krcg.seating.Score:
+    """Same as engine.optimise_full_seating, without blocking the event loop."""
+    if any(s.result.vp for table in round_.tables for s in table.seating):
+        raise engine.ResultRecorded()
+    rounds = [engine.round_to_krcg_round(r) for r in tournament.rounds]
+    rounds.append(engine.round_to_krcg_round(round_))
+    rounds, score = await optimise(rounds, len(tournament.rounds), budget)
+    for i, table in enumerate(rounds[-1]):
+        for j, uid in enumerate(table):
+            round_.tables[i].seating[j].player_uid = uid
+    return score
@@ -0,0 +1,68 @@
+"""Per-key in-process sequencing of requests, processed in groups.
+
+Requests submitted for the same key (eg. a tournament uid) are queued, and a single
+task processes them in order: the requests arriving within a few milliseconds
+of each other are processed as one group. Each caller gets its own result or error.
+"""
+
+import asyncio
+import dotenv
+import logging
+import os
+import typing
+
+LOG = logging.getLogger()
+
+dotenv.load_dotenv()
+SEQUENCER_DELAY = float(os.getenv("SEQUENCER_DELAY", "0.005"))  # seconds
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+
+class Sequencer(typing.Generic[T, R]):
+    """Queues submissions by key, processes them in groups and in order.
+
+    `process` is called with the key and a group of submissions,
+    it returns a result (or an exception) for each submission.
+    If it raises, all the group submissions get the exception.
+    """
+
+    def __init__(
+        self,
+        process: typing.Callable[[str, list[T]], typing.Awaitable[list[R | Exception]]],
+        delay: float | None = None,
+    ):
+        self.process = process
+        self.delay = SEQUENCER_DELAY if delay is None else delay
+        self.queues: dict[str, list[tuple[T, asyncio.Future]]] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    async def submit(self, key: str, item: T) -> R:
+        """Queue the item, returns its result once its group is processed"""
+        future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(key, []).append((item, future))
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.create_task(self._run(key))
+        return await future
+
+    async def _run(self, key: str) -> None:
+        try:
+            while self.queues.get(key):
+                # let concurrent submissions join the group
+                await asyncio.sleep(self.delay)
+                group = self.queues.pop(key)
+                try:
+                    results = await self.process(key, [item for item, _ in group])
+                except Exception as err:
+                    LOG.exception("Failed to process a group for %s", key)
+                    results = [err] * len(group)
+                for (_, future), result in zip(group, results):
+                    if future.done():  # caller cancelled
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            del self.tasks[key]
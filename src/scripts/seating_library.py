@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Build the server-side library of precomputed seatings from the frontend one.
+
+Binary format, zlib compressed, for each entry:
+- players count (uint16), rounds count (uint8)
+- for each round, the players numbers (uint16) in seating order,
+  tables are implied by the players count (5-seats tables first)
+"""
+
+import json
+import struct
+import zlib
+
+ROUNDS = 3
+SOURCE = "src/front/optimal_seating_3r.json"
+TARGET = "src/archon/seatingdata/optimal_seating.bin"
+
+
+def tables_sizes(players_count: int) -> list[int]:
+    seat_in_fives = players_count - 4 * (5 - (players_count % 5 or 5))
+    return [5] * (seat_in_fives // 5) + [4] * ((players_count - seat_in_fives) // 4)
+
+
+with open(SOURCE) as f:
+    data = json.load(f)
+
+res = bytearray()
+for players_count, rounds in sorted((int(k), v) for k, v in data.items()):
+    sizes = tables_sizes(players_count)
+    if len(rounds) != ROUNDS or any(
+        [len(table) for table in round_] != sizes
+        or sorted(n for table in round_ for n in table)
+        != list(range(1, players_count + 1))
+        for round_ in rounds
+    ):
+        print(f"Skipping {players_count} players: not a standard seating")
+        continue
+    res += struct.pack("<HB", players_count, len(rounds))
+    for round_ in rounds:
+        numbers = [n for table in round_ for n in table]
+        res += struct.pack(f"<{players_count}H", *numbers)
+
+with open(TARGET, "wb") as f:
+    f.write(zlib.compress(bytes(res), 9))
+print(f"Saved to {TARGET}")
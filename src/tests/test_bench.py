@@ -0,0 +1,21 @@
+from archon import bench, engine, models
+
+
+def test_synthetic_tournament():
+    synthetic = bench.synthetic_tournament(20, rounds=2)
+    tournament = synthetic.tournament
+    assert tournament.state == models.TournamentState.FINISHED
+    assert len(tournament.rounds) == 3
+    # the events replay to the same tournament
+    replayed = engine.TournamentOrchestrator(**synthetic.config)
+    for ev in synthetic.events:
+        replayed.handle_event(ev, bench.JUDGE)
+    assert replayed.winner == tournament.winner
+    assert engine.standings(replayed) == engine.standings(tournament)
+
+
+def test_run():
+    report = bench.run([20], rounds=1, repeat=1)
+    names = {r["name"] for r in report["results"]}
+    assert "handle_event.SET_RESULT" in names
+    assert {"standings", "ratings", "from_jsonb"} <= names
@@ -0,0 +1,25 @@
+from archon import cache
+
+
+def test_lru_cache():
+    now = [0.0]
+    lru = cache.LRUCache(2, ttl=10, clock=lambda: now[0])
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    # "b" is the least recently used
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    now[0] = 11
+    assert lru.get("a") is None
+    assert lru.get("c") is None
+    # a value computed before an eviction is not stored
+    version = lru.version
+    lru.pop("a")
+    lru.set("a", 4, version)
+    assert lru.get("a") is None
+    lru.set("a", 4, lru.version)
+    assert lru.get("a") == 4
+    lru.enabled = False
+    assert lru.get("a") is None
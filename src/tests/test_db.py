@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import datetime
+import typing
+import uuid
+
+import psycopg
+import pytest
+
+from archon import db, engine, events, models
+
+
+@pytest.fixture(scope="module")
+def database():
+    """Initialise the database, skip the test if there is none"""
+    try:
+        psycopg.connect(db.CONNINFO, connect_timeout=2).close()
+    except psycopg.OperationalError:
+        pytest.skip("no database available")
+
+    async def init():
+        async with db.POOL:
+            await db.init()
+
+    asyncio.run(init())
+
+
+@contextlib.asynccontextmanager
+async def _operator() -> typing.AsyncIterator[db.Operator]:
+    """An operator on its own connection, commits on success"""
+    async with await psycopg.AsyncConnection.connect(db.CONNINFO) as conn:
+        yield db.Operator(conn)
+
+
+@pytest.mark.parametrize("count", [45, 2 * db.MEMBERS_SEARCH_LIMIT])
+def test_members_search_pages(database, count):
+    # members tied on a few (float4) similarity scores
+    token = "Qzvkwj"
+    names = [f"{token} {{}}", f"Alpha {token}ab{{}}", f"{token[:-1]} {{}}"]
+    members = [
+        models.Person(name=names[i % len(names)].format(i)) for i in range(count)
+    ]
+
+    async def main():
+        try:
+            async with _operator() as op:
+                for member in members:
+                    await op.insert_member(member)
+            seen = []
+            filter = models.MemberFilter(q=token)
+            async with _operator() as op:
+                while True:
+                    filter, page = await op.search_members(filter, vekn_only=False)
+                    assert len(page) <= db.MEMBERS_SEARCH_LIMIT
+                    seen.extend(p.uid for p in page)
+                    # the cursor goes through the API as JSON
+                    filter = models.MemberFilter.model_validate_json(
+                        filter.model_dump_json()
+                    )
+                    if not filter.uid:
+                        break
+            return seen
+        finally:
+            async with _operator() as op:
+                await op.conn.execute(
+                    "DELETE FROM members WHERE uid = ANY(%s)",
+                    [[uuid.UUID(m.uid) for m in members]],
+                )
+
+    seen = asyncio.run(main())
+    # no duplicates, no gaps
+    assert len(seen) == len(set(seen)) == count
+    assert set(seen) == {m.uid for m in members}
+    # best matches first: exact names, longer words, then partial words
+    groups = {m.uid: i % len(names) for i, m in enumerate(members)}
+    assert [groups[uid] for uid in seen] == sorted(groups.values())
+
+
+def test_ranking_cutoff():
+    def cutoff(*date):
+        now = datetime.datetime(*date, 15, 30, tzinfo=datetime.UTC)
+        return db.ranking_cutoff(now).date()
+
+    assert cutoff(2026, 10, 17) == datetime.date(2025, 4, 17)
+    assert cutoff(2026, 3, 1) == datetime.date(2024, 9, 1)
+    # day clamped to the end of shorter months
+    assert cutoff(2026, 12, 31) == datetime.date(2025, 6, 30)
+    assert cutoff(2026, 3, 31) == datetime.date(2024, 9, 30)
+    assert cutoff(2026, 5, 31) == datetime.date(2024, 11, 30)
+    assert cutoff(2026, 8, 31) == datetime.date(2025, 2, 28)
+    assert cutoff(2026, 10, 31) == datetime.date(2025, 4, 30)
+    assert cutoff(2028, 2, 29) == datetime.date(2026, 8, 29)
+    assert cutoff(2025, 8, 31) == datetime.date(2024, 2, 29)
+
+
+def test_tournament_written_out_of_band(database):
+    start = datetime.datetime(2026, 1, 1, 10)
+
+    async def main():
+        async with _operator() as op:
+            league = models.League(
+                name="Test league",
+                start=start,
+                timezone="UTC",
+                format=models.TournamentFormat.Standard,
+                ranking=models.LeagueRanking.RTP,
+            )
+            league.uid = await op.create_league(league)
+            uid = await op.create_tournament(
+                models.TournamentConfig(name="Test", start=start, league=league)
+            )
+        try:
+            async with _operator() as op:
+                tournament = await op.get_tournament(
+                    uid, cls=engine.TournamentOrchestrator
+                )
+            # written between the read and the write of the tournament
+            async with _operator() as op:
+                await op.delete_league(league.uid)
+            async with _operator() as op:
+                with pytest.raises(db.Conflict):
+                    await op.update_tournament(tournament, check_version=True)
+                current = await op.get_current_tournament(
+                    uid, tournament, cls=engine.TournamentOrchestrator
+                )
+                assert current is not tournament
+                assert current.league is None
+        finally:
+            async with _operator() as op:
+                await op.delete_tournament(uid)
+
+    asyncio.run(main())
+
+
+def test_replay_purged_events(database):
+    judge = models.Person(name="Judge")
+    journal = [
+        (
+            judge.uid,
+            events.Register(type=events.EventType.REGISTER, name=f"Player {i}"),
+        )
+        for i in range(3)
+    ]
+
+    async def main():
+        async with _operator() as op:
+            await op.insert_member(judge)
+            uid = await op.create_tournament(
+                models.TournamentConfig(
+                    name="Test", start=datetime.datetime(2026, 1, 1, 10)
+                )
+            )
+            await op.record_events(uid, journal)
+        try:
+            async with _operator() as op:
+                assert len((await op.replay_tournament(uid, 2)).players) == 2
+                # the first event is purged
+                await op.conn.execute(
+                    "DELETE FROM tournament_events "
+                    "WHERE tournament_uid=%s AND position=1",
+                    [uuid.UUID(uid)],
+                )
+                for position in [None, 1, 2]:
+                    with pytest.raises(db.Purged):
+                        await op.replay_tournament(uid, position)
+                assert not (await op.replay_tournament(uid, 0)).players
+        finally:
+            async with _operator() as op:
+                await op.delete_tournament(uid)
+                await op.conn.execute(
+                    "DELETE FROM members WHERE uid=%s", [uuid.UUID(judge.uid)]
+                )
+
+    asyncio.run(main())
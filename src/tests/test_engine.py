@@ -1,8 +1,12 @@
+import dataclasses
 import datetime
+import numpy
+import orjson
+import random
 
 import pytest
 
-from archon import engine, events, models
+from archon import bench, engine, events, models
 
 
 def _judge() -> models.Person:
@@ -108,3 +112,371 @@ def test_round_start_rejects_pp_repeat():
     )
     with pytest.raises(engine.PredatorPreyDuplicate):
         t.round_start(ev, _judge())
+
+
+def test_pp_index_follows_round_changes():
+    # The predator-prey index is maintained incrementally by round handlers:
+    # cancelling or altering a round must free its pairs for later seatings.
+    prelim_1 = [["a", "b", "c", "d", "e"]]
+    t = _tournament([prelim_1], state=models.TournamentState.WAITING)
+    for uid in "abcde":
+        t.players[uid].state = models.PlayerState.CHECKED_IN
+    judge = _judge()
+    t.round_start(
+        events.RoundStart(
+            type=events.EventType.ROUND_START, seating=[["a", "c", "e", "b", "d"]]
+        ),
+        judge,
+    )
+    assert t._pp_index()[("a", "c")] == {2}
+    # round 2 pairs cannot be reused when altering round 1
+    with pytest.raises(engine.PredatorPreyDuplicate):
+        t.round_alter(
+            events.RoundAlter(
+                type=events.EventType.ROUND_ALTER,
+                round=1,
+                seating=[["a", "c", "b", "d", "e"]],
+            ),
+            judge,
+        )
+    # altering round 2 releases its previous pairs
+    t.round_alter(
+        events.RoundAlter(
+            type=events.EventType.ROUND_ALTER,
+            round=2,
+            seating=[["a", "d", "b", "e", "c"]],
+        ),
+        judge,
+    )
+    assert ("a", "c") not in t._pp_index()
+    assert t._pp_index()[("a", "d")] == {2}
+    t.round_cancel(events.RoundCancel(type=events.EventType.ROUND_CANCEL), judge)
+    assert ("a", "d") not in t._pp_index()
+    assert t._pp_index()[("a", "b")] == {1}
+
+
+def test_seat_index_follows_round_alter():
+    prelim_1 = [["a", "b", "c", "d"], ["e", "f", "g", "h"]]
+    t = _tournament([prelim_1], state=models.TournamentState.PLAYING)
+    judge = _judge()
+    assert t._find_seat(1, "f")[1].player_uid == "f"
+    t.round_alter(
+        events.RoundAlter(
+            type=events.EventType.ROUND_ALTER,
+            round=1,
+            seating=[["e", "h", "g", "f"], ["a", "d", "c", "b"]],
+        ),
+        judge,
+    )
+    assert t.players["f"].table == 1
+    assert t.players["f"].seat == 4
+    t.set_result(
+        events.SetResult(
+            type=events.EventType.SET_RESULT, player_uid="f", round=1, vps=2
+        ),
+        judge,
+    )
+    assert t.rounds[0].tables[0].seating[3].result.vp == 2
+    assert t.players["f"].result.vp == 2
+    t.players["z"] = _player("z")
+    with pytest.raises(engine.PlayerAbsent):
+        t.set_result(
+            events.SetResult(
+                type=events.EventType.SET_RESULT, player_uid="z", round=1, vps=1
+            ),
+            judge,
+        )
+
+
+def test_template_seating():
+    uids = [f"p{i}" for i in range(1, 13)]
+    t = _tournament([[uids[:4], uids[4:8], uids[8:]]], models.TournamentState.PLAYING)
+    for player in t.players.values():
+        player.state = models.PlayerState.CHECKED_IN
+    # 12 players, second round of the 3R precomputed seating
+    round_ = engine.template_seating(t)
+    assert [[s.player_uid for s in table.seating] for table in round_.tables] == [
+        ["p6", "p12", "p4", "p9"],
+        ["p11", "p1", "p5", "p7"],
+        ["p8", "p3", "p10", "p2"],
+    ]
+    t.rounds.append(round_)
+    assert engine.template_seating(t) is not None
+    # previous round did not follow the template
+    t.rounds[-1] = _round([uids[:4], uids[4:8], uids[8:]])
+    assert engine.template_seating(t) is None
+    # a player dropped
+    t.rounds.pop()
+    t.players["p1"].state = models.PlayerState.FINISHED
+    assert engine.template_seating(t) is None
+
+
+def test_standings_index_follows_results():
+    t = _tournament(
+        [[["a", "b", "c", "d", "e"], ["f", "g", "h", "i"]]],
+        models.TournamentState.PLAYING,
+    )
+    for player in t.players.values():
+        player.state = models.PlayerState.PLAYING
+        player.rounds_played = 1
+    index = t.standings_index()
+    judge = _judge()
+    for uid, vps in [("a", 3), ("b", 2), ("f", 4), ("c", 0), ("d", 0), ("e", 0)]:
+        t.handle_event(
+            events.SetResult(
+                type=events.EventType.SET_RESULT, player_uid=uid, round=1, vps=vps
+            ),
+            judge,
+        )
+    t.handle_event(events.Drop(type=events.EventType.DROP, player_uid="b"), judge)
+    # maintained incrementally, matches a full sort
+    assert t.standings_index() is index
+    assert index.ranked() == engine.Standings(t).ranked()
+    assert [p.uid for _, p in index.top(2)] == ["f", "a"]
+    assert index.rank("b") == 9
+    assert index.cutoff() == index.ranked()[5][1].result
+    # other events drop the index
+    for uid in ["g", "h", "i"]:
+        t.handle_event(
+            events.SetResult(
+                type=events.EventType.SET_RESULT, player_uid=uid, round=1, vps=0
+            ),
+            judge,
+        )
+    t.handle_event(events.RoundFinish(type=events.EventType.ROUND_FINISH), judge)
+    assert t.standings_index() is not index
+
+
+def test_ratings_version_follows_content():
+    t = _tournament([[["a", "b", "c", "d"]]], models.TournamentState.FINISHED)
+    version = engine.ratings_version(t)
+    # players order does not matter (JSONB does not keep keys order)
+    t.players = dict(reversed(t.players.items()))
+    assert engine.ratings_version(t) == version
+    # changes that do not impact ratings keep the version
+    t.description = "Changed"
+    assert engine.ratings_version(t) == version
+    t.players["a"].result.vp = 2
+    assert engine.ratings_version(t) != version
+
+
+def test_bulk_ratings_match_ratings():
+    rng = random.Random(42)
+    tournaments = []
+    for size in [3, 4, 5, 6, 7, 12, 30]:
+        uids = [f"p{i}" for i in range(size)]
+        t = _tournament([[uids]], models.TournamentState.FINISHED)
+        t.rank = rng.choice(list(models.TournamentRank))
+        for player in t.players.values():
+            player.rounds_played = rng.randint(0, 3)
+            player.result.gw = rng.randint(0, 2)
+            player.result.vp = rng.randint(0, 8) / 2
+            player.result.tp = rng.choice([12, 24, 36, 48, 60])
+            player.state = models.PlayerState.FINISHED
+        t.finals_seeds = uids[:5]
+        t.winner = uids[0]
+        for uid in uids[:2]:
+            t.players[uid].toss = rng.randint(0, 2)
+        tournaments.append(t)
+    rows = [
+        (i, p)
+        for i, t in enumerate(tournaments)
+        for p in t.players.values()
+        if p.rounds_played
+    ]
+    size, rank, rating_points, gp_points = engine.bulk_ratings(
+        tournament=numpy.array([i for i, _ in rows]),
+        coef_bonus=numpy.array(
+            [engine.RATING_COEF_BONUS.get(t.rank, 0) for t in tournaments]
+        ),
+        dropped=numpy.array([p.state == models.PlayerState.FINISHED for _, p in rows]),
+        winner=numpy.array([p.uid == tournaments[i].winner for i, p in rows]),
+        finalist=numpy.array([p.uid in tournaments[i].finals_seeds for i, p in rows]),
+        gw=numpy.array([p.result.gw for _, p in rows]),
+        vp=numpy.array([p.result.vp for _, p in rows]),
+        tp=numpy.array([p.result.tp for _, p in rows]),
+        toss=numpy.array([p.toss for _, p in rows]),
+    )
+    expected = [engine.ratings(t) for t in tournaments]
+    for j, (i, player) in enumerate(rows):
+        rating = expected[i][player.uid]
+        assert (size[j], rank[j], rating_points[j], gp_points[j]) == (
+            rating.size,
+            rating.rank,
+            rating.rating_points,
+            rating.gp_points,
+        )
+
+
+def _apply_changes(data: dict, t: engine.TournamentManager, changes: engine.Changes):
+    """What the DB partial update does, on the JSON data"""
+    for name in changes.fields:
+        data[name] = orjson.loads(orjson.dumps(getattr(t, name)))
+    for uid in changes.players:
+        data["players"][uid] = orjson.loads(orjson.dumps(t.players[uid]))
+    for i, j in changes.tables:
+        data["rounds"][i]["tables"][j] = orjson.loads(
+            orjson.dumps(t.rounds[i].tables[j])
+        )
+
+
+def _handle_and_compare(
+    t: engine.TournamentManager, data: dict, ev: events.TournamentEvent
+) -> tuple[dict, bool]:
+    """Handle the event, check the partial write gives the full tournament data.
+    Returns the data, and whether the write was partial.
+    """
+    t.handle_event(ev, bench.JUDGE)
+    changes = t.pop_changes()
+    full = orjson.loads(orjson.dumps(dataclasses.asdict(t)))
+    if changes.full:
+        return full, False
+    _apply_changes(data, t, changes)
+    assert data == full, ev.type
+    return data, True
+
+
+def test_changes_follow_events():
+    synthetic = bench.synthetic_tournament(20, rounds=2)
+    t = engine.TournamentOrchestrator(**synthetic.config)
+    data = None
+    partial = 0
+    for ev in synthetic.events:
+        data, is_partial = _handle_and_compare(t, data, ev)
+        partial += is_partial
+    assert partial > len(synthetic.events) // 2
+    # changes accumulate until popped
+    t.handle_event(
+        events.Sanction(
+            type=events.EventType.SANCTION,
+            sanction_uid="s1",
+            player_uid=next(iter(t.players)),
+            level=events.SanctionLevel.CAUTION,
+            category=events.SanctionCategory.PROCEDURAL_ERROR,
+        ),
+        bench.JUDGE,
+    )
+    t.handle_event(
+        events.ReopenTournament(type=events.EventType.REOPEN_TOURNAMENT), bench.JUDGE
+    )
+    assert t.pop_changes().full
+    assert t.pop_changes() == engine.Changes()
+
+
+def test_changes_follow_partial_events():
+    t = engine.TournamentOrchestrator(
+        **bench.synthetic_tournament(10, rounds=1).config,
+        multideck=True,
+        decklist_required=False,
+    )
+    uids = [f"p{i}" for i in range(10)]
+    deck = models.KrcgDeck(
+        crypt=models.KrcgCrypt(count=12), library=models.KrcgLibrary(count=60)
+    )
+    data = None
+
+    def handle(ev: events.TournamentEvent, partial: bool = True) -> None:
+        nonlocal data
+        if ev.type == events.EventType.SET_DECK:
+            t.resolve_deck(ev.uid, deck)
+        data, is_partial = _handle_and_compare(t, data, ev)
+        assert is_partial == partial, ev.type
+
+    handle(events.OpenRegistration(type=events.EventType.OPEN_REGISTRATION), False)
+    for uid in uids:
+        handle(
+            events.Register(type=events.EventType.REGISTER, name=uid, player_uid=uid)
+        )
+    handle(events.SetDeck(type=events.EventType.SET_DECK, player_uid="p0", deck="p0"))
+    handle(events.OpenCheckin(type=events.EventType.OPEN_CHECKIN), False)
+    handle(events.CheckIn(type=events.EventType.CHECK_IN, player_uid="p0"))
+    handle(events.CheckOut(type=events.EventType.CHECK_OUT, player_uid="p0"))
+    handle(events.CheckEveryoneIn(type=events.EventType.CHECK_EVERYONE_IN), False)
+    handle(
+        events.RoundStart(
+            type=events.EventType.ROUND_START, seating=[uids[:5], uids[5:]]
+        ),
+        False,
+    )
+    # multideck: the deck of the round is on the seat
+    handle(
+        events.SetDeck(
+            type=events.EventType.SET_DECK, player_uid="p6", round=1, deck="p6"
+        )
+    )
+    for uid, vps in zip(uids[:5], [2.0, 0.0, 1.0, 1.0, 1.0]):
+        handle(
+            events.SetResult(
+                type=events.EventType.SET_RESULT, player_uid=uid, round=1, vps=vps
+            )
+        )
+    handle(
+        events.Override(
+            type=events.EventType.OVERRIDE, round=1, table=2, comment="Judge call"
+        )
+    )
+    handle(events.Unoverride(type=events.EventType.UNOVERRIDE, round=1, table=2))
+    for level in [
+        events.SanctionLevel.CAUTION,
+        events.SanctionLevel.DISQUALIFICATION,
+    ]:
+        handle(
+            events.Sanction(
+                type=events.EventType.SANCTION,
+                sanction_uid=level,
+                player_uid="p7",
+                level=level,
+                category=events.SanctionCategory.PROCEDURAL_ERROR,
+            )
+        )
+    handle(
+        events.Unsanction(
+            type=events.EventType.UNSANCTION,
+            player_uid="p7",
+            sanction_uid=events.SanctionLevel.DISQUALIFICATION,
+        )
+    )
+    assert t.players["p0"].deck is deck
+    assert t.rounds[0].tables[1].seating[1].deck is deck
+    assert t.sanctions["p7"][0].level == events.SanctionLevel.CAUTION
+
+
+def test_parse_deck_caches_failures(monkeypatch):
+    calls = []
+
+    def from_url(url):
+        calls.append(url)
+        raise ValueError("Unknown deck URL provider")
+
+    monkeypatch.setattr(engine.krcg.deck.Deck, "from_url", from_url)
+    url = "https://example.com/deck/1"
+    with pytest.raises(engine.DeckUnavailable):
+        engine.parse_deck(url, refresh=True)
+    # the handler gets the failure without fetching again
+    with pytest.raises(engine.DeckUnavailable, match="Unknown deck URL provider"):
+        engine.parse_deck(url)
+    assert calls == [url]
+    engine.DECK_CACHE.pop(url)
+
+
+def test_set_deck_resolved():
+    tournament = engine.TournamentManager(
+        name="Test", start=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    )
+    judge = _judge()
+    tournament.handle_event(
+        events.Register(type=events.EventType.REGISTER, name="P1", player_uid="p1"),
+        judge,
+    )
+    deck = models.KrcgDeck(
+        crypt=models.KrcgCrypt(count=12), library=models.KrcgLibrary(count=60)
+    )
+    ev = events.SetDeck(
+        type=events.EventType.SET_DECK, player_uid="p1", deck="https://gone.example"
+    )
+    # replayed from the journal: the deck is not fetched
+    tournament.resolve_deck(ev.uid, deck)
+    tournament.handle_event(ev, judge)
+    assert tournament.players["p1"].deck is deck
+    assert tournament.pop_decks() == {ev.uid: deck}
+    assert tournament.pop_decks() == {}
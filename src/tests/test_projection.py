@@ -0,0 +1,56 @@
+import dataclasses
+import orjson
+import pydantic
+
+from archon import bench, models, projection
+
+
+def _deck() -> models.KrcgDeck:
+    return models.KrcgDeck(
+        crypt=models.KrcgCrypt(count=12), library=models.KrcgLibrary(count=60)
+    )
+
+
+def _dump(cls: type, obj) -> dict:
+    return orjson.loads(pydantic.TypeAdapter(cls).dump_json(obj))
+
+
+def test_projections_match_models():
+    tournament = bench.synthetic_tournament(20, rounds=2).tournament
+    member_uid, other_uid = list(tournament.players)[:2]
+    for uid in (member_uid, other_uid):
+        tournament.players[uid].deck = _deck()
+        tournament.rounds[0].tables[0].seating[0].deck = _deck()
+    assert orjson.loads(
+        projection.dumps(projection.tournament_data(tournament))
+    ) == _dump(models.Tournament, tournament)
+    assert orjson.loads(
+        projection.dumps(projection.tournament_config(tournament))
+    ) == _dump(
+        models.TournamentConfig,
+        models.TournamentConfig(**dataclasses.asdict(tournament)),
+    )
+    info = models.TournamentInfo(**dataclasses.asdict(tournament))
+    for uid, player in info.players.items():
+        if uid != member_uid:
+            player.deck = None
+    for round_ in info.rounds:
+        for table in round_.tables:
+            for seat in table.seating:
+                if seat.player_uid != member_uid:
+                    seat.deck = None
+    data = orjson.loads(
+        projection.dumps(projection.tournament_info(tournament, member_uid))
+    )
+    assert data == _dump(models.TournamentInfo, info)
+    assert data["players"][member_uid]["deck"]
+    assert not data["players"][other_uid]["deck"]
+    # the live tournament is untouched
+    assert tournament.players[other_uid].deck
+    # hidden scores
+    data = projection.tournament_info(tournament, member_uid, {member_uid})
+    assert (
+        data["players"][member_uid]["result"] == tournament.players[member_uid].result
+    )
+    assert data["players"][other_uid]["result"] == {"gw": 0, "vp": 0.0, "tp": 0}
+    assert data["players"][other_uid]["name"] == tournament.players[other_uid].name
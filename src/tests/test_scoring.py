@@ -1,3 +1,7 @@
+import itertools
+import math
+
+import pydantic
 import pytest
 
 from archon import scoring
@@ -508,3 +512,112 @@ def test_check_invalid_impossible_withdrawal():
         ),
         scoring.MissingHalfVP,
     )
+
+
+def test_score_arithmetic():
+    a = scoring.Score(1, 3, 60)
+    b = scoring.Score.unchecked(0, 1.5, 24)
+    assert a + b == scoring.Score(1, 4.5, 84)
+    assert b - a == scoring.Score(0, 0, 0)
+    a -= b
+    assert a == scoring.Score(1, 1.5, 36)
+    with pytest.raises(pydantic.ValidationError):
+        scoring.Score(0, 0.3, 0)
+
+
+def _baseline_compute_table_scores(scores: list[scoring.Score]) -> float:
+    """compute_table_scores() as it was before the precomputed tables"""
+    tps = [t for _, t in zip(range(max(5, len(scores))), itertools.count(12, 12))]
+    if len(scores) < 5:
+        tps.pop(2)
+        tps = tps[4 - len(scores) :]
+    scores_by_vps = sorted(scores, key=lambda x: x.vp)
+    for vp, results in itertools.groupby(scores_by_vps, lambda x: x.vp):
+        results = list(results)
+        tp = sum(tps.pop(0) for _ in range(len(results))) // len(results)
+        if vp >= 2 and len(results) == 1 and len(tps) == 0:
+            gw = 1
+        else:
+            gw = 0
+        for r in results:
+            r.gw = gw
+            r.tp = tp
+    return vp
+
+
+def _baseline_check_table_vps(
+    scores: list[scoring.Score],
+) -> scoring.ScoringError | None:
+    """check_table_vps() as it was before the precomputed tables"""
+    if len(scores) < 4 or len(scores) > 5:
+        return scoring.InvalidTableSize()
+    total = sum(math.ceil(s.vp) for s in scores)
+    if total < len(scores):
+        return scoring.InsufficientTotal()
+    if total > len(scores):
+        return scoring.ExcessiveTotal()
+    vps = [[i, s.vp] for i, s in enumerate(scores)]
+    while len(vps) > 0:
+        for j, (idx, vp_count) in enumerate(vps):
+            if vp_count <= 0:
+                if vp_count % 1:
+                    return scoring.MissingVP(f"missing VP for seat {idx + 1}")
+                vps[(j - 1) % len(vps)][1] += vp_count - 1
+                vps.pop(j)
+                break
+        else:
+            if all([vp == 0.5 for _, vp in vps]):
+                if len(vps) == 1:
+                    return scoring.MissingHalfVP(
+                        f"Seat {vps[0][0] + 1} cannot timeout alone"
+                    )
+            vps = [[i, vp] for i, vp in vps if vp != 0.5]
+            if len(vps) > 1:
+                return scoring.MissingHalfVP(
+                    f"Missing half vps for seats {[i + 1 for i, _ in vps]}"
+                )
+            break
+
+
+def test_precomputed_tables():
+    # all 4 and 5 seats tables without excessive total are precomputed
+    assert (2.0, 0.0, 1.0, 1.0, 1.0) in scoring.VALIDITY
+    assert (0.5, 0.5, 0.5, 0.5) in scoring.TABLE_SCORES
+    assert (5.0, 1.0, 0.0, 0.0, 0.0) not in scoring.VALIDITY
+    assert len(scoring.VALIDITY) == len(scoring.TABLE_SCORES) == 2004
+    # outcomes by the rules
+    assert scoring.VALIDITY[(0.0, 0.0, 0.0, 0.0, 5.0)] is None
+    assert scoring.VALIDITY[(0.5, 0.5, 0.5, 0.5)] is None
+    assert scoring.VALIDITY[(1.0, 0.0, 0.0, 0.0)] == (scoring.InsufficientTotal, ())
+    assert scoring.VALIDITY[(3.0, 0.0, 0.0, 2.0, 0.0)] == (
+        scoring.MissingHalfVP,
+        ("Missing half vps for seats [1, 4]",),
+    )
+    assert scoring.TABLE_SCORES[(5.0, 0.0, 0.0, 0.0, 0.0)] == (
+        5.0,
+        ((1, 60), (0, 30), (0, 30), (0, 30), (0, 30)),
+    )
+    assert scoring.TABLE_SCORES[(0.5, 0.5, 0.5, 0.5)] == (0.5, ((0, 36),) * 4)
+    assert scoring.TABLE_SCORES[(3.0, 0.0, 0.0, 2.0, 0.0)] == (
+        3.0,
+        ((1, 60), (0, 24), (0, 24), (0, 48), (0, 24)),
+    )
+    # no GW on a tie
+    assert scoring.TABLE_SCORES[(2.0, 2.0, 0.0, 0.0, 1.0)] == (
+        2.0,
+        ((0, 54), (0, 54), (0, 18), (0, 18), (0, 36)),
+    )
+    # same outcomes as the computations they replace
+    for vps, error in scoring.VALIDITY.items():
+        expected = _baseline_check_table_vps([scoring.Score(vp=vp) for vp in vps])
+        assert error == (expected and (type(expected), expected.args))
+    for vps, (max_vp, results) in scoring.TABLE_SCORES.items():
+        scores = [scoring.Score(vp=vp) for vp in vps]
+        assert max_vp == _baseline_compute_table_scores(scores)
+        assert results == tuple((s.gw, s.tp) for s in scores)
+    # errors are new instances, with their message
+    scores = [scoring.Score(vp=vp) for vp in (0, 0, 1.5, 1.5)]
+    error = scoring.check_table_vps(scores)
+    assert isinstance(error, scoring.MissingVP)
+    assert error is not scoring.check_table_vps(scores)
+    assert str(error) == "missing VP for seat 4"
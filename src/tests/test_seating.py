@@ -0,0 +1,51 @@
+import asyncio
+import datetime
+import time
+
+import krcg.seating
+
+from archon import engine, models, seating
+
+
+def test_optimise_full_seating_off_loop():
+    uids = [f"p{i}" for i in range(12)]
+    tournament = models.Tournament(
+        name="Test",
+        start=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc),
+        players={
+            uid: models.Player(name=uid, uid=uid, state=models.PlayerState.CHECKED_IN)
+            for uid in uids
+        },
+    )
+    tournament.rounds.append(engine.next_round_seating(tournament))
+    round_ = engine.next_round_seating(tournament)
+    try:
+        # start the worker first: the budget bounds the optimisation itself
+        seating.get_pool().submit(int).result()
+        score = asyncio.run(seating.optimise_full_seating(tournament, round_, budget=5))
+    finally:
+        seating.shutdown()
+    assert sorted(s.player_uid for t in round_.tables for s in t.seating) == sorted(
+        uids
+    )
+    # no predator-prey relationship is repeated
+    assert not score.R1
+
+
+def test_optimise_budget_exceeded():
+    players = [f"p{i}" for i in range(20)]
+    rounds = [krcg.seating.Round([players[i : i + 5] for i in range(0, 20, 5)])]
+
+    async def optimise():
+        start = time.monotonic()
+        ret = await seating.optimise(rounds, 0, budget=0.2, iterations=10**6)
+        return ret, time.monotonic() - start
+
+    try:
+        (optimised, score), duration = asyncio.run(optimise())
+    finally:
+        seating.shutdown()
+    # the restart could not finish: the rounds are returned as they are
+    assert duration < 1
+    assert optimised == rounds
+    assert score.total == krcg.seating.Score(rounds).total
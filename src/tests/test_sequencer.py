@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from archon import sequencer
+
+
+def test_sequencer_groups_and_orders():
+    groups = []
+
+    async def process(key: str, items: list[int]) -> list[int | Exception]:
+        groups.append((key, items))
+        await asyncio.sleep(0.01)
+        return [ValueError(i) if i < 0 else i * 2 for i in items]
+
+    async def main():
+        seq = sequencer.Sequencer(process, delay=0.01)
+        first = [seq.submit("a", i) for i in [1, -2, 3]] + [seq.submit("b", 4)]
+        results = await asyncio.gather(*first, return_exceptions=True)
+        # submitted while the first group is processed: next group
+        later = asyncio.ensure_future(seq.submit("a", 5))
+        await asyncio.sleep(0)
+        results.append(await later)
+        assert not seq.tasks
+        return results
+
+    results = asyncio.run(main())
+    assert [r if isinstance(r, int) else str(r) for r in results] == [2, "-2", 6, 8, 10]
+    assert groups == [("a", [1, -2, 3]), ("b", [4]), ("a", [5])]
+
+
+def test_sequencer_process_error():
+    async def process(key: str, items: list[int]) -> list[int]:
+        raise RuntimeError("failed")
+
+    async def main():
+        seq = sequencer.Sequencer(process, delay=0)
+        return await asyncio.gather(seq.submit("a", 1), seq.submit("a", 2))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())